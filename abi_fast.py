@@ -0,0 +1,151 @@
+import struct
+from typing import Iterator, List, Sequence, Tuple
+
+# size of an ABI word in bytes
+WORD = 32
+
+
+def _read_uint(view: memoryview, position) -> int:
+    """
+    Reads a single uint256 word, e.g. an offset or a length
+    Args:
+        view: Raw return value of eth_call
+        position: Byte position of the word
+
+    Returns: Value of the word
+
+    """
+    if position + WORD > len(view):
+        raise ValueError(f"Tried to read word at {position}, only got {len(view)} bytes")
+
+    return int.from_bytes(view[position:position + WORD], "big")
+
+
+def _read_array_head(view: memoryview) -> Tuple[int, int]:
+    """
+    Reads position and length of a dynamic array, which is the only return value
+    Args:
+        view: Raw return value of eth_call
+
+    Returns: Tuple with the position of the first element head and the number of elements
+
+    """
+    position = _read_uint(view, 0)
+    length = _read_uint(view, position)
+
+    return position + WORD, length
+
+
+def _read_offsets(view: memoryview, base, length) -> Sequence[int]:
+    """
+    Reads the heads of all elements of a dynamic array in one call, instead of one integer per element
+    Args:
+        view: Raw return value of eth_call
+        base: Byte position of the first element head
+        length: Number of elements
+
+    Returns: Offsets of the elements, relative to base
+
+    """
+    if base + length * WORD > len(view):
+        raise ValueError(f"Tried to read {length} offsets at {base}, only got {len(view)} bytes")
+
+    # each word is read as four 64 bit integers, the upper three must be zero for any offset within the data
+    words = struct.unpack_from(f">{length * 4}Q", view, base)
+    if any(words[0::4]) or any(words[1::4]) or any(words[2::4]):
+        raise ValueError("Offset exceeds the size of the return value")
+
+    return words[3::4]
+
+
+def _decode_string(view: memoryview, position) -> str:
+    """
+    Decodes a single string element straight from the raw data
+    Args:
+        view: Raw return value of eth_call
+        position: Byte position of the length word of the string
+
+    Returns: Decoded string
+
+    """
+    start = position + WORD
+    end = start + _read_uint(view, position)
+
+    if end > len(view):
+        raise ValueError(f"Tried to read string until {end}, only got {len(view)} bytes")
+
+    return str(view[start:end], "utf-8")
+
+
+class LazyStringArray(Sequence[str]):
+    """
+        string[] return value decoding each element on access, without copying the raw data
+    """
+
+    def __init__(self, data: bytes):
+        """
+        Creates instance of LazyStringArray, only the element heads are read upfront
+        Args:
+            data: Raw return value of eth_call of a function returning string[]
+        """
+        self.__view = memoryview(data)
+        self.__base, length = _read_array_head(self.__view)
+        self.__offsets = _read_offsets(self.__view, self.__base, length)
+
+    def __len__(self) -> int:
+        return len(self.__offsets)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(len(self)))]
+
+        return _decode_string(self.__view, self.__base + self.__offsets[index])
+
+    def __iter__(self) -> Iterator[str]:
+        for offset in self.__offsets:
+            yield _decode_string(self.__view, self.__base + offset)
+
+    def __eq__(self, other) -> bool:
+        return isinstance(other, Sequence) and list(self) == list(other)
+
+    def __repr__(self) -> str:
+        return f"LazyStringArray({len(self)} strings)"
+
+
+def decode_string_array(data: bytes, lazy=False) -> Sequence[str]:
+    """
+    Decodes the return value of a function returning string[], the same as web3's generic decoder but without
+    allocating a stream and decoder per element. Padding bytes are not validated.
+    Args:
+        data: Raw return value of eth_call
+        lazy: Decode each element on access instead of all at once
+
+    Returns: List of str, or LazyStringArray if lazy
+
+    """
+    if lazy:
+        return LazyStringArray(data)
+
+    view = memoryview(data)
+    base, length = _read_array_head(view)
+
+    return [_decode_string(view, base + offset) for offset in _read_offsets(view, base, length)]
+
+
+def decode_bytes32_array(data: bytes) -> List[bytes]:
+    """
+    Decodes the return value of a function returning bytes32[], the same as web3's generic decoder
+    Args:
+        data: Raw return value of eth_call
+
+    Returns: List of bytes
+
+    """
+    view = memoryview(data)
+    base, length = _read_array_head(view)
+
+    end = base + length * WORD
+    if end > len(view):
+        raise ValueError(f"Tried to read {length} words at {base}, only got {len(view)} bytes")
+
+    return [view[position:position + WORD].tobytes() for position in range(base, end, WORD)]
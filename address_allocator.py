@@ -0,0 +1,111 @@
+import ipaddress
+import math
+from collections import deque
+from typing import Tuple
+
+
+class AddressAllocator:
+    """
+        Deterministically hands out unreserved ip addresses and ports from free-lists, spanning multiple /24 subnets
+    """
+
+    def __init__(self, network="172.25.0.0/16", host_range=(10, 254), port_range=(30310, 40000)):
+        """
+        Creates instance of AddressAllocator, holding the free-lists of all addresses not yet handed out.
+        Args:
+            network: Address pool which is split into consecutive /24 subnets
+            host_range: Range of the last 8 bits of an ip address usable within each /24 subnet
+            port_range: Range of ports usable for the nodes
+        """
+
+        # address pool split into /24 subnets, opened one after the other when the previous one is exhausted
+        self.__network = ipaddress.ip_network(network)
+        self.__subnets = self.__network.subnets(new_prefix=24)
+
+        # number of /24 subnets opened so far, defines the size of the docker network
+        self.__n_subnets = 0
+
+        # usable range of the last 8 bits of an ip address within each /24 subnet
+        self.__host_range = host_range
+
+        # free-lists of addresses not yet handed out
+        self.__free_ips = deque()
+        self.__free_ports = deque(range(*port_range))
+
+        # addresses reserved beforehand (e.g. static ip of boot node) or already handed out
+        self.__reserved_ips = set()
+        self.__reserved_ports = set()
+
+        # open first subnet, static addresses of the network are always located in it
+        self.__open_subnet()
+
+    @property
+    def network(self) -> str:
+        """
+        Returns: Whole address pool, used to restrict peer discovery of the nodes
+        """
+        return str(self.__network)
+
+    @property
+    def subnet(self) -> str:
+        """
+        Returns: Smallest subnet covering all /24 subnets opened so far, used for the docker network config
+        """
+        prefix = 24 - math.ceil(math.log2(self.__n_subnets))
+        return str(ipaddress.ip_network((self.__network.network_address, prefix)))
+
+    def __open_subnet(self) -> None:
+        """
+        Adds all hosts of the next /24 subnet to the free-list of ip addresses
+        Returns: None
+
+        """
+        try:
+            subnet = next(self.__subnets)
+        except StopIteration:
+            raise RuntimeError(f"No unreserved ip address left in {self.__network}")
+
+        self.__n_subnets += 1
+        self.__free_ips.extend(str(subnet.network_address + host) for host in range(*self.__host_range))
+
+    def reserve(self, ip=None, port=None) -> None:
+        """
+        Excludes an ip address and/or port from being handed out
+        Args:
+            ip: ip address to exclude
+            port: port to exclude
+
+        Returns: None
+
+        """
+        if ip is not None:
+            self.__reserved_ips.add(ip)
+        if port is not None:
+            self.__reserved_ports.add(port)
+
+    def allocate(self) -> Tuple[str, int]:
+        """
+        Pops the next unreserved ip address and port from the free-lists
+        Returns: Unreserved ip address and port
+
+        """
+
+        # skip addresses which were reserved after their subnet was opened
+        while True:
+            if not self.__free_ips:
+                self.__open_subnet()
+            ip = self.__free_ips.popleft()
+            if ip not in self.__reserved_ips:
+                break
+
+        while True:
+            if not self.__free_ports:
+                raise RuntimeError("No unreserved port left")
+            port = self.__free_ports.popleft()
+            if port not in self.__reserved_ports:
+                break
+
+        # add network address to reserved addresses
+        self.__reserved_ips.add(ip)
+        self.__reserved_ports.add(port)
+        return ip, port
@@ -0,0 +1,205 @@
+import argparse
+import json
+import os
+import platform
+import statistics
+import sys
+import tempfile
+import timeit
+from datetime import datetime
+
+# benchmarks import the modules of the repository root
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT_DIR)
+
+from eth_account import Account
+from web3 import Web3
+
+from abi_fast import decode_string_array
+from blockchain_deployer import BlockchainDeployer
+from oracle.app import can_compile_offline, compile_chaincode
+
+# static but valid values, benchmarks run offline without any node
+CHAIN_ID = 19265019
+CONTRACT_ADDRESS = "0x0Ff11c707cF01A7cdd5A894cf39C1231E6723E9E"
+PRIVATE_KEY = "0x" + "11" * 32
+
+# chain code and its committed compiler output, recompiling requires an installed solc
+SOURCE_PATH = os.path.join(ROOT_DIR, "chaincode", "chaincode.sol")
+CACHE_PATH = os.path.join(ROOT_DIR, "chaincode", "compiled_code.json")
+
+# ABI of ChainCode's addStr, building, encoding and signing its transactions needs neither bytecode nor compiler
+ADD_STR_ABI = [{
+    "type": "function",
+    "name": "addStr",
+    "stateMutability": "nonpayable",
+    "inputs": [{"name": "str", "type": "string", "internalType": "string"}],
+    "outputs": []
+}]
+
+LIST_SIZES = (10, 100, 1000, 10000, 100000)
+VALIDATOR_COUNTS = (3, 10, 100, 500)
+
+
+def measure(func, repeat=5) -> dict:
+    """
+    Times a function, the number of calls per round is chosen to last at least 0.2 seconds
+    Args:
+        func: Function without arguments to time
+        repeat: Number of rounds
+
+    Returns: Statistics in seconds per call
+
+    """
+    timer = timeit.Timer(func)
+    number, _ = timer.autorange()
+    rounds = [t / number for t in timer.repeat(repeat=repeat, number=number)]
+
+    return {
+        "min": min(rounds),
+        "median": statistics.median(rounds),
+        "mean": statistics.fmean(rounds),
+        "calls": number * repeat
+    }
+
+
+def run_benchmarks(work_dir) -> dict:
+    """
+    Runs all benchmarks of the Python hot paths
+    Args:
+        work_dir: Temporary folder for generated deployments
+
+    Returns: Statistics per benchmark
+
+    """
+    results = dict()
+    web3 = Web3()
+
+    if can_compile_offline(SOURCE_PATH, CACHE_PATH):
+        # warm the compiler cache, only the cached path is measured
+        compile_chaincode(SOURCE_PATH, CACHE_PATH)
+        results["compile_chaincode_warm"] = measure(lambda: compile_chaincode(SOURCE_PATH, CACHE_PATH))
+    else:
+        print(f"Skipped compile_chaincode_warm, solc is not installed and {CACHE_PATH} holds no output of the "
+              f"current source")
+
+    results.update(run_transaction_benchmarks(web3))
+
+    for size in LIST_SIZES:
+        data = web3.codec.encode(["string[]"], [[f"word{i}" for i in range(size)]])
+        results[f"decode_getStrList_{size}"] = measure(lambda: web3.codec.decode(["string[]"], data), repeat=3)
+        results[f"decode_fast_getStrList_{size}"] = measure(lambda: decode_string_array(data), repeat=3)
+
+    for n_validator in VALIDATOR_COUNTS:
+        config_dir = os.path.join(work_dir, f"deployment_{n_validator}")
+        results[f"generate_deployment_{n_validator}"] = measure(
+            lambda: BlockchainDeployer(n_validator=n_validator, config_dir=config_dir, boot=False, seed="benchmark"),
+            repeat=3
+        )
+
+    return results
+
+
+def run_transaction_benchmarks(web3) -> dict:
+    """
+    Runs the benchmarks of building, encoding and signing a transaction of the chain code
+    Args:
+        web3: Web3 object without provider
+
+    Returns: Statistics per benchmark
+
+    """
+    results = dict()
+    contract = web3.eth.contract(address=CONTRACT_ADDRESS, abi=ADD_STR_ABI)
+    account = Account.from_key(PRIVATE_KEY)
+
+    # all fields are set, so building the transaction requires no node
+    def build_transaction():
+        return contract.functions.addStr("benchmark").build_transaction({
+            "chainId": CHAIN_ID,
+            "from": account.address,
+            "nonce": 0,
+            "gas": 200000,
+            "gasPrice": web3.to_wei("1", "gwei")
+        })
+
+    transaction = build_transaction()
+    results["build_transaction_addStr"] = measure(build_transaction)
+    results["sign_transaction"] = measure(lambda: Account.sign_transaction(transaction, PRIVATE_KEY))
+    results["encode_addStr"] = measure(lambda: contract.encodeABI(fn_name="addStr", args=["benchmark"]))
+
+    return results
+
+
+def compare(results, baseline_path, threshold) -> list:
+    """
+    Compares the results with a previous run
+    Args:
+        results: Statistics of the current run
+        baseline_path: JSON file of a previous run
+        threshold: Relative slowdown of the median which counts as regression
+
+    Returns: Names of the regressed benchmarks
+
+    """
+    with open(baseline_path, "r") as file:
+        baseline = json.load(file)["results"]
+
+    regressions = list()
+    for name, stats in results.items():
+        if name not in baseline:
+            continue
+
+        change = stats["median"] / baseline[name]["median"] - 1
+        print(f"{name:<32} {baseline[name]['median'] * 1e6:>14.2f}us -> {stats['median'] * 1e6:>14.2f}us "
+              f"({change:+.1%})")
+
+        if change > threshold:
+            regressions.append(name)
+
+    return regressions
+
+
+def main(argv=None) -> int:
+    """
+    Runs the benchmarks, stores the results and compares them with a previous run
+    Args:
+        argv: Command line arguments, defaults to sys.argv
+
+    Returns: Exit code, 1 if a benchmark regressed
+
+    """
+    parser = argparse.ArgumentParser(description="Offline microbenchmarks of the Python hot paths")
+    parser.add_argument("--output", default=os.path.join(ROOT_DIR, "benchmarks", "results",
+                                                         f"{datetime.now().strftime('%Y-%m-%d_%H-%M')}.json"),
+                        help="JSON file the results are written to")
+    parser.add_argument("--compare", default=None, help="JSON file of a previous run to check for regressions")
+    parser.add_argument("--threshold", type=float, default=0.2, help="relative slowdown counted as regression")
+    args = parser.parse_args(argv)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        benchmark_results = run_benchmarks(tmp)
+
+    for benchmark, statistic in benchmark_results.items():
+        print(f"{benchmark:<32} {statistic['median'] * 1e6:>14.2f}us")
+
+    os.makedirs(os.path.dirname(os.path.abspath(args.output)), exist_ok=True)
+    with open(args.output, "w") as file:
+        json.dump({
+            "timestamp": datetime.now().isoformat(),
+            "python": platform.python_version(),
+            "machine": platform.machine(),
+            "results": benchmark_results
+        }, file, indent=4)
+
+    if args.compare:
+        regressed = compare(benchmark_results, args.compare, args.threshold)
+        if regressed:
+            print(f"Regressions: {', '.join(regressed)}")
+            return 1
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
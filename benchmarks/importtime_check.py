@@ -0,0 +1,107 @@
+import argparse
+import os
+import subprocess
+import sys
+from typing import Dict, List, Tuple
+
+# the check runs the command line of the repository root
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+CLI_PATH = os.path.join(ROOT_DIR, "gethwizard.py")
+
+# invocations which must start without loading any heavy dependency
+SCENARIOS = {
+    "help": ["--help"],
+    "deploy --help": ["deploy", "--help"],
+    "oracle --help": ["oracle", "--help"],
+    "client --help": ["client", "--help"],
+    "bench --help": ["bench", "--help"],
+    "status --help": ["status", "--help"]
+}
+
+# packages only imported by the subcommand needing them
+HEAVY_PACKAGES = ("web3", "eth_account", "eth_keys", "eth_utils", "eth_abi", "eth_tester", "solcx", "flask",
+                  "requests", "coincurve")
+
+# modules of the subcommands, reported for reference without budget
+SUBCOMMAND_MODULES = ("blockchain_deployer", "client", "oracle.app")
+
+
+def profile_imports(args: List[str]) -> Dict[str, int]:
+    """
+    Runs python with -X importtime and collects the time each module took to import itself
+    Args:
+        args: Arguments of the python interpreter after -X importtime
+
+    Returns: Self time in microseconds per imported module
+
+    """
+    completed = subprocess.run([sys.executable, "-X", "importtime", *args], cwd=ROOT_DIR, capture_output=True,
+                               text=True, check=True)
+
+    modules = dict()
+    for line in completed.stderr.splitlines():
+        # import time:  self [us] | cumulative | imported package
+        if not line.startswith("import time:") or "imported package" in line:
+            continue
+        self_time, _, name = line[len("import time:"):].split("|")
+        modules[name.strip()] = int(self_time)
+
+    return modules
+
+
+def measure(args: List[str], baseline: Dict[str, int], repeat) -> Tuple[int, List[str]]:
+    """
+    Measures the import time of an invocation on top of the bare interpreter
+    Args:
+        args: Arguments of the python interpreter after -X importtime
+        baseline: Modules imported by the bare interpreter
+        repeat: Number of runs, the fastest one is reported
+
+    Returns: Import time in microseconds and the heavy packages imported
+
+    """
+    runs = [profile_imports(args) for _ in range(repeat)]
+    total = min(sum(t for name, t in modules.items() if name not in baseline) for modules in runs)
+    heavy = sorted({name.split(".")[0] for name in runs[0]} & set(HEAVY_PACKAGES))
+
+    return total, heavy
+
+
+def main(argv=None) -> int:
+    """
+    Checks the startup of the command line against an import time budget and the absence of heavy packages
+    Args:
+        argv: Command line arguments, defaults to sys.argv
+
+    Returns: Exit code, 1 if a scenario exceeds the budget or imports a heavy package
+
+    """
+    parser = argparse.ArgumentParser(description="Import time regression check of the gethwizard command line")
+    parser.add_argument("--budget", type=float, default=50.0, help="import time in ms allowed per scenario")
+    parser.add_argument("--repeat", type=int, default=3, help="runs per scenario, the fastest one counts")
+    args = parser.parse_args(argv)
+
+    baseline = profile_imports(["-c", "pass"])
+    failures = list()
+
+    for scenario, cli_args in SCENARIOS.items():
+        total, heavy = measure([CLI_PATH, *cli_args], baseline, args.repeat)
+        print(f"{scenario:<32} {total / 1000:>10.1f}ms {'imports ' + ', '.join(heavy) if heavy else ''}")
+
+        if heavy or total / 1000 > args.budget:
+            failures.append(scenario)
+
+    print("*" * 50)
+    for module in SUBCOMMAND_MODULES:
+        total, _ = measure(["-c", f"import {module}"], baseline, args.repeat)
+        print(f"{'import ' + module:<32} {total / 1000:>10.1f}ms")
+
+    if failures:
+        print(f"Regressions: {', '.join(failures)}")
+        return 1
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,16 +1,20 @@
 import os.path
-import random
+import re
 import shutil
 import textwrap
 import json
 from datetime import datetime
 from typing import Tuple
 
-from web3 import Web3
-from eth_keys import keys
 import subprocess
+from retry import retry
 
-w3 = Web3()
+from address_allocator import AddressAllocator
+from key_material import generate_identities
+from profiles import PROFILES
+
+# geth's metrics endpoint, sampled by the metrics collector
+METRICS_FLAGS = "--metrics --metrics.addr=0.0.0.0 --metrics.port=6060"
 
 
 class BlockchainDeployer:
@@ -18,39 +22,115 @@ class BlockchainDeployer:
         Creates files (docker-compose.yaml and genesis.json) for deploying blockchain network
     """
 
-    def __init__(self, n_validator=3, config_dir="."):
+    def __init__(self, n_validator=3, config_dir=".", boot=True, seed=None, n_rpc=1, profile=None,
+                 incremental=False, n_accounts=10, rpc_proxy=False):
         """
         Creates instance of BlockchainDeployer, holding all static settings and paths for exporting the configurations.
         Args:
             n_validator: Number of validator nodes to deploy
             config_dir: Output directory for logging deployed configurations
+            boot: Boot the network with docker compose after exporting the configurations
+            seed: Optional seed for regenerating the same key material bit-for-bit on every deployment
+            n_rpc: Number of non-validator nodes with RPC-API to deploy, exposed on consecutive host ports from 8545
+            profile: Name of the tuning profile for genesis and geth nodes, one of 'default', 'latency', 'throughput',
+                defaults to 'default' or to the profile of the running deployment if incremental
+            incremental: Scale out the running deployment stored in config_dir by n_validator validators and n_rpc
+                non-validator nodes, instead of deploying a new network
+            n_accounts: Number of client accounts prefunded in the genesis, leased to clients by the Oracle
+            rpc_proxy: Add a caching JSON-RPC proxy in front of the non-validator nodes, exposed on host port 8645 and
+                used by the Oracle
         """
 
+        if profile is not None and profile not in PROFILES:
+            raise ValueError(f"Unknown profile '{profile}', choose one of {', '.join(PROFILES)}")
+
         # Dir storing chain code and other property files
         self.__input_dir = os.path.dirname(os.path.abspath(__file__))
 
         # config folder for storing generated files for deployment
         self.__config_dir = config_dir
+
+        # scale out existing deployment instead of creating a new network
+        self.__incremental = incremental
+
+        # names of services added by this run, started without touching the running ones
+        self.__new_services = list()
+
+        # names of volumes persisting the chain data of each node
+        self.__volumes = list()
         # random but static id of boot node to be assigned to all other nodes
         self.__boot_id = None
 
         # ip address of boot node (needs to be static)
         self.__boot_ip = "172.25.0.101"
 
-        # ip address of non-validator node (needs to be static)
+        # ip address of first non-validator node (needs to be static)
         self.__rpc_ip = "172.25.0.104"
 
         # ip address of oracle (needs to be static)
         self.__oracle_ip = "172.25.0.105"
 
-        # temporary yaml parameter to store config before dump
-        self.__yaml = str()
-
-        # set of reserved addresses which need to be excluded in random address generation
-        self.__reserved_addresses = set()
-
-        # load original genesis dict
-        self.__genesis = self.__load_genesis()
+        # ip address of the caching RPC proxy (needs to be static)
+        self.__proxy_ip = "172.25.0.106"
+
+        # temporary yaml parameter to store config before dump, one entry per service
+        self.__yaml = list()
+
+        if incremental:
+            # load keys, addresses and genesis of the running deployment
+            self.__state = self.__load_state()
+            self.__genesis = self.__load_deployed_genesis()
+
+            # genesis and running nodes keep the profile they were deployed with
+            if profile is not None and profile != self.__state["profile"]:
+                raise ValueError(f"Deployment in {config_dir} runs profile '{self.__state['profile']}', "
+                                 f"it cannot be scaled out with profile '{profile}'")
+
+            # docker cannot change the subnet of a running network, new nodes are allocated within it
+            self.__allocator = AddressAllocator(network=self.__state["subnet"])
+        else:
+            self.__state = {
+                # volumes are named after the deployment, a new deployment never picks up old chain data
+                "volume_prefix": re.sub(r"[^a-zA-Z0-9_.-]", "_", os.path.basename(os.path.abspath(config_dir))),
+                "profile": profile or "default",
+                "rpc_proxy": rpc_proxy,
+                "seed": None if seed is None else str(seed),
+                "n_identities": 0,
+                "validators": list(),
+                "rpcs": list(),
+                "accounts": list()
+            }
+
+            # load original genesis dict
+            self.__genesis = self.__load_genesis()
+
+            # deterministic allocator handing out unreserved network addresses from free-lists
+            self.__allocator = AddressAllocator()
+            self.__state["network"] = self.__allocator.network
+
+        # exclude static addresses and addresses of running nodes from allocation
+        for ip in (self.__boot_ip, self.__rpc_ip, self.__oracle_ip, self.__proxy_ip):
+            self.__allocator.reserve(ip=ip)
+        for node in self.__state["validators"] + self.__state["rpcs"]:
+            self.__allocator.reserve(ip=node["ip"], port=node.get("port"))
+
+        # tuning settings applied to the genesis and all geth nodes, a running deployment keeps its profile
+        self.__profile = PROFILES[self.__state["profile"]]
+
+        if not incremental:
+            # apply block time and gas limit of the profile
+            self.__genesis["config"]["clique"]["period"] = self.__profile.period
+            self.__genesis["gasLimit"] = str(self.__profile.gas_limit)
+
+        # the account pool is part of the genesis and cannot grow in a running network
+        n_accounts = 0 if incremental else n_accounts
+
+        # generate key material of all new nodes in one batch: boot node, validators (key and password), rpcs,
+        # oracle and account pool, continuing the seeded batch of the running deployment
+        n_identities = 2 * n_validator + n_rpc + n_accounts + (0 if incremental else 2)
+        self.__identities = iter(generate_identities(
+            n_identities, seed=self.__state["seed"], start=self.__state["n_identities"]))
+        self.__state["n_identities"] += n_identities
 
         # create blockchain directory in scenario's config directory
         self.__setup_dir()
@@ -61,17 +141,27 @@ class BlockchainDeployer:
         # add n validator nodes to the genesis.json and yaml file
         self.__add_validator(n_validator)
 
-        # add non-validator node to the yaml file
-        self.__add_non_validator()
+        # add n non-validator nodes to the yaml file
+        self.__add_non_validator(n_rpc)
+
+        # add caching proxy in front of the non-validator nodes to the yaml file, a running deployment keeps its choice
+        if self.__state.get("rpc_proxy"):
+            self.__add_rpc_proxy()
 
         # add oracle node to the genesis.json and yaml file
         self.__add_oracle()
 
+        # add n prefunded client accounts to the genesis.json
+        self.__add_account_pool(n_accounts)
+
         # dump config files into scenario's config directory
         self.__export_config()
 
         # boot geth network with docker-compose
-        self.__boot_blockchain()
+        if boot and incremental:
+            self.__scale_out_blockchain()
+        elif boot:
+            self.__boot_blockchain()
 
     def __setup_dir(self) -> None:
         """
@@ -81,24 +171,31 @@ class BlockchainDeployer:
         if not os.path.exists(self.__config_dir):
             os.makedirs(self.__config_dir, exist_ok=True)
 
-    def __get_unreserved_address(self) -> Tuple[int, int]:
+    def __load_state(self) -> dict:
         """
-        Computes a randomized port and last 8 bits of an ip address, where both are not yet used
-        Returns: Randomized and unreserved lat 8 bit of ip and port
+        Loads keys and addresses of all nodes of a previous deployment from its config folder
+        Returns: Deployment state dict
 
         """
+        with open(os.path.join(self.__config_dir, "deployment.json"), "r") as file:
+            return json.load(file)
 
-        # extract reserved ports and ip addresses
-        reserved_ips = [address[0] for address in self.__reserved_addresses]
-        reserved_ports = [address[1] for address in self.__reserved_addresses]
+    def __load_deployed_genesis(self) -> dict:
+        """
+        Loads genesis of a previous deployment, it must not change while the network is running
+        Returns: Genesis json dict
 
-        # get randomized ip and port in range still unreserved
-        ip = random.choice([number for number in range(10, 254) if number not in reserved_ips])
-        port = random.choice([number for number in range(30310, 30360) if number not in reserved_ports])
+        """
+        with open(os.path.join(self.__config_dir, "genesis.json"), "r") as file:
+            return json.load(file)
 
-        # add network address to list of reserved addresses
-        self.__reserved_addresses.add((ip, port))
-        return ip, port
+    def __get_unreserved_address(self) -> Tuple[str, int]:
+        """
+        Takes the next ip address and port from the allocator's free-lists, where both are not yet used
+        Returns: Unreserved ip address and port
+
+        """
+        return self.__allocator.allocate()
 
     def __copy_dir(self, source_path) -> None:
         """
@@ -144,7 +241,7 @@ class BlockchainDeployer:
 
                 # Proof-of-Authority settings
                 "clique": {
-                    "period": 1,  # block time (time in seconds between two blocks)
+                    "period": 1,  # block time (time in seconds between two blocks), set by profile
                     "epoch": 10000  # number of blocks after reset the pending votes
                 }
             },
@@ -160,7 +257,7 @@ class BlockchainDeployer:
             "extraData": "0x0000000000000000000000000000000000000000000000000000000000000000187c1c14c75bA185A59c621Fbe5dda26D488852DF20C144e8aE3e1aCF7071C4883B759D1B428e7930000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000",
 
             # maximum gas (computational cost) per transaction
-            "gasLimit": "9000000000000",  # "8000000" is default for Ethereum but too low for heavy load
+            "gasLimit": "9000000000000",  # "8000000" is default for Ethereum but too low for heavy load, set by profile
 
             # difficulty for PoW
             "difficulty": "0x1",
@@ -196,68 +293,96 @@ class BlockchainDeployer:
 
         """
 
-        # create random private key and create account from it
-        acc = w3.eth.account.create()
+        if "boot" not in self.__state:
+            # take pre-generated key material
+            acc = next(self.__identities)
+            self.__state["boot"] = {"private_key": acc.private_key, "public_key": acc.public_key}
 
         # store id of boot node to be inserted into all other nodes
-        self.__boot_id = str(keys.PrivateKey(acc.key).public_key)[2:]
+        self.__boot_id = self.__state["boot"]["public_key"]
 
         # add service to yaml string
-        self.__yaml += textwrap.dedent(f"""
+        self.__yaml.append(textwrap.dedent(f"""
             geth-bootnode:
                 hostname: geth-bootnode
                 environment:
-                  - nodekeyhex={w3.to_hex(acc.key)[2:]}
+                  - nodekeyhex={self.__state["boot"]["private_key"]}
+                  - netrestrict={self.__state["network"]}
                 build:
                   dockerfile: {self.__input_dir}/geth/boot.dockerfile
                 container_name: boot
                 networks:
                   chainnet:
                     ipv4_address: {self.__boot_ip}
-            """)
+            """))
 
     def __add_validator(self, cnt) -> None:
         """
-        Randomly generates and adds number(cnt) of validator nodes to yaml and genesis.json
+        Randomly generates and adds number(cnt) of validator nodes to yaml and genesis.json, next to the validators
+        of a running deployment
         Args:
             cnt: number of validator nodes to create
 
         Returns: None
 
         """
-        validator_addresses = list()
+        validators = self.__state["validators"]
 
-        for id in range(cnt):
-            # create random private key and create account from it
-            acc = w3.eth.account.create()
-            validator_addresses.append(acc.address[2:])
+        for _ in range(cnt):
+            # take pre-generated key material for the account and its password
+            acc = next(self.__identities)
+            password = next(self.__identities)
 
-            # get random network address
+            # get unreserved network address
             ip, port = self.__get_unreserved_address()
 
-            self.__yaml += textwrap.dedent(f"""
+            self.__new_services.append(f"geth-validator-{len(validators)}")
+            validators.append({
+                "address": acc.address,
+                "private_key": acc.private_key,
+                "password": f"0x{password.private_key}",
+                "ip": ip,
+                "port": port
+            })
+
+        for id, validator in enumerate(validators):
+            self.__volumes.append(f"validator_{id}")
+
+            # build the shared image once with the first validator, all others reuse it
+            image_source = f"build: {{dockerfile: {self.__input_dir}/geth/validator.dockerfile}}" if id == 0 \
+                else "pull_policy: never"
+
+            self.__yaml.append(textwrap.dedent(f"""
                 geth-validator-{id}:
                     hostname: geth-validator-{id}
                     depends_on:
                       - geth-bootnode
                     environment:
-                      - address={acc.address}
+                      - address={validator["address"]}
+                      - privatekey={validator["private_key"]}
+                      - password={validator["password"]}
                       - bootnodeId={self.__boot_id}
                       - bootnodeIp={self.__boot_ip}
-                      - port={port}
-                    build:
-                      dockerfile: {self.__input_dir}/geth/validator.dockerfile
-                      args:
-                        privatekey: {w3.to_hex(acc.key)[2:]}
-                        password: {w3.to_hex(w3.eth.account.create().key)}
+                      - port={validator["port"]}
+                      - netrestrict={self.__state["network"]}
+                      - gethFlags={self.__profile.validator_flags} {METRICS_FLAGS}
+                    image: blockchain-validator
+                    {image_source}
+                    volumes:
+                      - ./genesis.json:/genesis.json:ro
+                      - validator_{id}:/root/.ethereum
                     container_name: validator_{id}
                     networks:
                       chainnet:
-                        ipv4_address: 172.25.0.{ip}
-                """)
+                        ipv4_address: {validator["ip"]}
+                """))
+
+        # validators of a running network are authorized by clique votes instead
+        if self.__incremental:
+            return
 
         # create specific Ethereum extra data string for PoA with all public addresses of validators
-        extra_data = "0x" + "0" * 64 + "".join([a for a in validator_addresses]) + 65 * "0" + 65 * "0"
+        extra_data = "0x" + "0" * 64 + "".join([v["address"][2:] for v in validators]) + 65 * "0" + 65 * "0"
         self.__genesis["extraData"] = extra_data
 
     def __add_oracle(self) -> None:
@@ -267,77 +392,182 @@ class BlockchainDeployer:
 
         """
 
-        # create random private key and create account from it
-        acc = w3.eth.account.create()
+        self.__volumes.append("oracle")
 
-        # prefund oracle by allocating all funds to its public wallet address
-        self.__genesis["alloc"] = {acc.address: {
-            "balance": "0x200000000000000000000000000000000000000000000000000000000000000"
-        }}
+        if "oracle" not in self.__state:
+            # take pre-generated key material
+            acc = next(self.__identities)
+            self.__state["oracle"] = {"private_key": acc.private_key, "address": acc.address}
 
-        self.__yaml += textwrap.dedent(f"""
+            # prefund oracle by allocating all funds to its public wallet address
+            self.__genesis["alloc"] = {acc.address: {
+                "balance": "0x200000000000000000000000000000000000000000000000000000000000000"
+            }}
+
+        self.__yaml.append(textwrap.dedent(f"""
             oracle:
                hostname: oracle
                depends_on:
-                 - geth-rpc 
-                 - geth-bootnode
+                 - geth-rpc-0
+                 - geth-bootnode{self.__proxy_dependency()}
                environment:
-                 - PRIVATE_KEY={w3.to_hex(acc.key)[2:]}
-                 - RPC_IP={self.__rpc_ip}
+                 - PRIVATE_KEY={self.__state["oracle"]["private_key"]}
+                 - RPC_URLS={self.__oracle_rpc_urls()}
+                 - CONTRACT_FILE=/data/contract.json
+                 - LEASE_FILE=/data/leases.json
+                 - ACCOUNT_POOL=/account-pool.json
                build:
                  dockerfile: {self.__input_dir}/geth/oracle.dockerfile
                  context: {self.__input_dir}
+               volumes:
+                 - oracle:/data
+                 - ./account-pool.json:/account-pool.json:ro
                ports:
                  - 8081:8081
                container_name: oracle
                networks:
                  chainnet:
                    ipv4_address: {self.__oracle_ip}
-            """)
+            """))
+
+    def __rpc_urls(self) -> str:
+        """
+        Returns: Comma separated URLs of all non-validator nodes within the docker network
+        """
+        return ",".join(f"http://{rpc['ip']}:8545" for rpc in self.__state["rpcs"])
+
+    def __oracle_rpc_urls(self) -> str:
+        """
+        Returns: URL of the caching proxy if deployed, URLs of all non-validator nodes otherwise
+        """
+        if self.__state.get("rpc_proxy"):
+            return f"http://{self.__proxy_ip}:8545"
+
+        return self.__rpc_urls()
+
+    def __proxy_dependency(self) -> str:
+        """
+        Returns: Additional depends_on entry of the Oracle if the caching proxy is deployed
+        """
+        return "\n                 - rpc-proxy" if self.__state.get("rpc_proxy") else ""
 
-    def __add_non_validator(self):
+    def __add_rpc_proxy(self) -> None:
         """
-        Add non-validator node to yaml
+        Adds caching JSON-RPC proxy to yaml, balancing its cache misses across all non-validator nodes
         Returns: None
 
         """
-        # create random private key and create account from it
-        acc = w3.eth.account.create()
-
-        self.__yaml += textwrap.dedent(f"""
-            geth-rpc:
-                 hostname: geth-rpc
-                 depends_on:
-                   - geth-bootnode
-                 environment:
-                   - address={acc.address}
-                   - bootnodeId={self.__boot_id}
-                   - bootnodeIp={self.__boot_ip}
-                 build:
-                   dockerfile: {self.__input_dir}/geth/rpc.dockerfile
-                 ports:
-                   - 8545:8545
-                 container_name: rpc
-                 networks:
-                   chainnet:
-                     ipv4_address: {self.__rpc_ip}
-            """)
+        self.__yaml.append(textwrap.dedent(f"""
+            rpc-proxy:
+               hostname: rpc-proxy
+               depends_on:
+                 - geth-rpc-0
+               environment:
+                 - RPC_URLS={self.__rpc_urls()}
+               build:
+                 dockerfile: {self.__input_dir}/geth/proxy.dockerfile
+                 context: {self.__input_dir}
+               ports:
+                 - 8645:8545
+               container_name: rpc-proxy
+               networks:
+                 chainnet:
+                   ipv4_address: {self.__proxy_ip}
+            """))
+
+    def __add_account_pool(self, cnt) -> None:
+        """
+        Randomly generates number(cnt) of client accounts and prefunds them in genesis.json, so clients need neither
+        a new account nor a faucet transaction
+        Args:
+            cnt: number of accounts to create
+
+        Returns: None
+
+        """
+        for _ in range(cnt):
+            # take pre-generated key material
+            acc = next(self.__identities)
+            self.__state["accounts"].append({"private_key": acc.private_key, "address": acc.address})
+
+            # prefund account with the amount transferred by the Oracle's faucet (500 ETH)
+            self.__genesis["alloc"][acc.address] = {"balance": hex(500 * 10 ** 18)}
+
+    def __add_non_validator(self, cnt):
+        """
+        Adds number(cnt) of non-validator nodes to yaml, each exposing its RPC-API and metrics on distinct host ports,
+        next to the non-validator nodes of a running deployment
+        Args:
+            cnt: number of non-validator nodes to create
+
+        Returns: None
+
+        """
+        rpcs = self.__state["rpcs"]
+
+        for _ in range(cnt):
+            # take pre-generated key material
+            acc = next(self.__identities)
+
+            # first node keeps the static ip address, all further nodes get unreserved addresses
+            ip = self.__rpc_ip if not rpcs else self.__get_unreserved_address()[0]
+
+            self.__new_services.append(f"geth-rpc-{len(rpcs)}")
+            rpcs.append({"address": acc.address, "ip": ip})
+
+        for id, rpc in enumerate(rpcs):
+            self.__volumes.append(f"rpc_{id}")
+
+            self.__yaml.append(textwrap.dedent(f"""
+                geth-rpc-{id}:
+                     hostname: geth-rpc-{id}
+                     depends_on:
+                       - geth-bootnode
+                     environment:
+                       - address={rpc["address"]}
+                       - bootnodeId={self.__boot_id}
+                       - bootnodeIp={self.__boot_ip}
+                       - gethFlags={self.__profile.rpc_flags} {METRICS_FLAGS}
+                     build:
+                       dockerfile: {self.__input_dir}/geth/rpc.dockerfile
+                     volumes:
+                       - ./genesis.json:/genesis.json:ro
+                       - rpc_{id}:/root/.ethereum
+                     ports:
+                       - {8545 + id}:8545
+                       - {6060 + id}:6060
+                     container_name: rpc_{id}
+                     networks:
+                       chainnet:
+                         ipv4_address: {rpc["ip"]}
+                """))
 
     def __add_network(self) -> None:
         """
-        Adds network config to docker-compose.yaml to create a private network for docker compose
+        Adds network config to docker-compose.yaml to create a private network for docker compose,
+        the bridge driver only accepts a single subnet, which therefore covers the allocator's whole address pool
         Returns: None
 
         """
-        self.__yaml += textwrap.dedent(f"""
+        self.__yaml.append(textwrap.dedent(f"""
             networks:
               chainnet:
                 name: chainnet
                 driver: bridge
                 ipam:
                   config:
-                  - subnet: 172.25.0.0/24
-            """)
+                  - subnet: {self.__state["subnet"]}
+            """))
+
+    def __add_volumes(self) -> None:
+        """
+        Adds named volumes to docker-compose.yaml, persisting chain data of each node across container recreation
+        Returns: None
+
+        """
+        self.__yaml.append("\nvolumes:\n" + "".join(
+            f"  {volume}:\n    name: {self.__state['volume_prefix']}-{volume}\n" for volume in self.__volumes
+        ))
 
     def __export_config(self) -> None:
         """
@@ -347,26 +577,40 @@ class BlockchainDeployer:
         """
 
         # format yaml and add docker compose properties
-        final_str = textwrap.indent(f"""{self.__yaml}""", "  ")
+        final_str = textwrap.indent("".join(self.__yaml), "  ")
 
-        self.__yaml = textwrap.dedent(f'''
+        self.__yaml = [textwrap.dedent(f'''
                     name: blockchain
                     services:
-                    ''')
+                    '''), final_str]
 
-        self.__yaml += final_str
+        # docker cannot change the subnet of a running network, a new one spans the whole address pool so scaling out
+        # is not bound to the /24 subnets opened by the first deployment
+        if not self.__incremental:
+            self.__state["subnet"] = self.__allocator.network
 
-        # add network config last
+        # add network and volume config last
         self.__add_network()
+        self.__add_volumes()
 
         with open(f"{self.__config_dir}/blockchain-docker-compose.yml", "w+") as file:
-            file.write(self.__yaml)
+            file.write("".join(self.__yaml))
 
-        with open(f"{self.__input_dir}/geth/genesis.json", "w+") as file:
-            json.dump(self.__genesis, file, indent=4)
+        # store keys and addresses of all nodes for scaling out the deployment later on
+        with open(os.path.join(self.__config_dir, "deployment.json"), "w+") as file:
+            json.dump(self.__state, file, indent=4)
+
+        # private keys of the account pool, mounted into the Oracle
+        with open(os.path.join(self.__config_dir, "account-pool.json"), "w+") as file:
+            json.dump([account["private_key"] for account in self.__state["accounts"]], file)
 
-        source = os.path.join(self.__input_dir, "geth", "genesis.json")
-        shutil.copy(source, os.path.join(self.__config_dir, "genesis.json"))
+        # genesis of a running network must not change
+        if self.__incremental:
+            return
+
+        # genesis is mounted into the nodes from the config folder, the source tree stays untouched
+        with open(os.path.join(self.__config_dir, "genesis.json"), "w+") as file:
+            json.dump(self.__genesis, file, indent=4)
 
         source = os.path.join(self.__input_dir, "chaincode", "chaincode.sol")
         shutil.copy(source, os.path.join(self.__config_dir, "chaincode.sol"))
@@ -374,6 +618,19 @@ class BlockchainDeployer:
     def __boot_blockchain(self):
         try:
             yaml_path = os.path.join(self.__input_dir, self.__config_dir, 'blockchain-docker-compose.yml')
+
+            # remove chain data left over from a previous deployment into the same config folder
+            subprocess.check_call(
+                [
+                    "docker",
+                    "compose",
+                    "-f",
+                    f"{yaml_path}",
+                    "down",
+                    "--volumes",
+                    "--remove-orphans"
+                ]
+            )
             subprocess.check_call(
                 [
                     "docker",
@@ -394,10 +651,119 @@ class BlockchainDeployer:
             )
             raise e
 
+    def __scale_out_blockchain(self):
+        """
+        Starts the services added to a running network without recreating the running nodes, recreates the Oracle and
+        the proxy if non-validator nodes were added and authorizes the new validators by clique votes
+        Returns: None
+
+        """
+        try:
+            yaml_path = os.path.join(self.__input_dir, self.__config_dir, 'blockchain-docker-compose.yml')
+            subprocess.check_call(
+                [
+                    "docker",
+                    "compose",
+                    "-f",
+                    f"{yaml_path}",
+                    "up",
+                    "--no-recreate",
+                    "-d",
+                    *self.__new_services
+                ]
+            )
+
+            # the Oracle and the proxy only learn about new non-validator nodes from their RPC_URLS, compose recreates
+            # those whose environment changed, the Oracle keeps its contract address in its volume
+            if any(service.startswith("geth-rpc-") for service in self.__new_services):
+                subprocess.check_call(
+                    [
+                        "docker",
+                        "compose",
+                        "-f",
+                        f"{yaml_path}",
+                        "up",
+                        "--no-deps",
+                        "-d",
+                        "oracle",
+                        *(["rpc-proxy"] if self.__state.get("rpc_proxy") else [])
+                    ]
+                )
+        except subprocess.CalledProcessError as e:
+            print(
+                "Docker Compose failed to scale out the blockchain, please check if the deployment is running."
+            )
+            raise e
+
+        # every validator proposes every new validator, proposals of not yet authorized validators are ignored until
+        # they are authorized themselves, which keeps the majority reachable when adding many validators at once
+        new_addresses = [
+            v["address"] for id, v in enumerate(self.__state["validators"])
+            if f"geth-validator-{id}" in self.__new_services
+        ]
+        for id in range(len(self.__state["validators"])):
+            for address in new_addresses:
+                self.__propose_validator(f"validator_{id}", address)
+
+    @staticmethod
+    @retry(subprocess.CalledProcessError, tries=10, delay=3)
+    def __propose_validator(container, address):
+        """
+        Casts the clique vote of a validator to authorize a new validator, retried until its IPC endpoint is up
+        Args:
+            container: Name of the voting validator's container
+            address: Public wallet address of the new validator
+
+        Returns: None
+
+        """
+        subprocess.check_call(
+            [
+                "docker",
+                "exec",
+                container,
+                "geth",
+                "attach",
+                "--exec",
+                f"clique.propose('{address}', true)"
+            ],
+            stdout=subprocess.DEVNULL
+        )
+
+    @staticmethod
+    def restart(config_dir) -> None:
+        """
+        Warm restart of a stopped deployment, reusing its containers and the chain data stored in its volumes
+        Args:
+            config_dir: Config folder of the deployment
+
+        Returns: None
+
+        """
+        yaml_path = os.path.join(os.path.dirname(os.path.abspath(__file__)), config_dir,
+                                 'blockchain-docker-compose.yml')
+        subprocess.check_call(["docker", "compose", "-f", f"{yaml_path}", "up", "-d"])
+
+    @staticmethod
+    def stop(config_dir) -> None:
+        """
+        Stops all containers of a deployment, keeping containers and volumes for a warm restart
+        Args:
+            config_dir: Config folder of the deployment
+
+        Returns: None
+
+        """
+        yaml_path = os.path.join(os.path.dirname(os.path.abspath(__file__)), config_dir,
+                                 'blockchain-docker-compose.yml')
+        subprocess.check_call(["docker", "compose", "-f", f"{yaml_path}", "stop"])
+
 
 if __name__ == "__main__":
     b = BlockchainDeployer(
         n_validator=3,
+        n_rpc=1,
+        profile="default",
         config_dir=os.path.join("deployments",
                                 datetime.now().strftime("%Y-%m-%d_%H-%M"))
     )
@@ -0,0 +1,59 @@
+import math
+
+
+class BloomFilter:
+    """
+        Probabilistic set of 32 byte hashes, answers without false negatives in constant memory
+    """
+
+    def __init__(self, capacity=100000, error_rate=0.01):
+        """
+        Creates instance of BloomFilter, sized for the capacity at the given false positive rate
+        Args:
+            capacity: Number of hashes after which the false positive rate exceeds error_rate
+            error_rate: Probability of reporting a hash which was never added
+        """
+        if capacity <= 0 or not 0 < error_rate < 1:
+            raise ValueError("Capacity must be positive and the error rate within (0, 1)")
+
+        # optimal number of bits and hash functions for capacity and error rate
+        self.__size = max(8, math.ceil(-capacity * math.log(error_rate) / math.log(2) ** 2))
+        self.__n_hashes = max(1, round(self.__size / capacity * math.log(2)))
+
+        self.__bits = bytearray((self.__size + 7) // 8)
+
+        # number of hashes added, duplicates included
+        self.__count = 0
+
+    def __positions(self, key: bytes):
+        """
+        Derives the bit positions of a key by double hashing, keccak hashes are uniform so no further hashing is needed
+        Args:
+            key: 32 byte hash
+
+        Returns: Iterator of bit positions
+
+        """
+        h1 = int.from_bytes(key[:8], "big")
+        h2 = int.from_bytes(key[8:16], "big") | 1
+
+        return ((h1 + i * h2) % self.__size for i in range(self.__n_hashes))
+
+    def add(self, key: bytes) -> None:
+        """
+        Adds a hash to the set
+        Args:
+            key: 32 byte hash
+
+        Returns: None
+
+        """
+        for position in self.__positions(key):
+            self.__bits[position >> 3] |= 1 << (position & 7)
+        self.__count += 1
+
+    def __contains__(self, key: bytes) -> bool:
+        return all(self.__bits[position >> 3] & (1 << (position & 7)) for position in self.__positions(key))
+
+    def __len__(self) -> int:
+        return self.__count
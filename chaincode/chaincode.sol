@@ -7,6 +7,15 @@ contract ChainCode {
     // persistent storage array, expensive in gas but dynamic in size
     string[] public strList;
 
+    // content-addressed storage, each distinct string is stored once keyed by its keccak256 hash
+    mapping(bytes32 => string) private strByRef;
+
+    // true for every hash stored, separate from strByRef since the empty string is a valid content
+    mapping(bytes32 => bool) private refKnown;
+
+    // hashes of the distinct strings in the order they were stored first
+    bytes32[] public refList;
+
     // contract can be loaded with ETH during deployment
     constructor() payable {}
 
@@ -19,4 +28,85 @@ contract ChainCode {
     function getStrList() public view returns (string[] memory){
         return strList;
     }
+
+    // public method returning the number of stored strings, free of gas since of type view
+    function strCount() public view returns (uint256){
+        return strList.length;
+    }
+
+    // public method returning up to limit stored strings starting at offset, bounded in gas and response size
+    function getStrRange(uint256 offset, uint256 limit) public view returns (string[] memory){
+        uint256 count = strList.length;
+        if (offset >= count) {
+            return new string[](0);
+        }
+
+        // cut the page at the end of the list, written to avoid an overflow of offset + limit
+        if (limit > count - offset) {
+            limit = count - offset;
+        }
+
+        string[] memory page = new string[](limit);
+        for (uint256 i = 0; i < limit; i++) {
+            page[i] = strList[offset + i];
+        }
+        return page;
+    }
+
+    // public method storing a string only if its content is new, a duplicate costs no storage write
+    function addStrRef(string memory str) public returns (bytes32){
+        bytes32 ref = keccak256(bytes(str));
+        if (!refKnown[ref]) {
+            refKnown[ref] = true;
+            strByRef[ref] = str;
+            refList.push(ref);
+        }
+        return ref;
+    }
+
+    // public method checking if a content was stored, free of gas since of type view
+    function hasStr(bytes32 ref) public view returns (bool){
+        return refKnown[ref];
+    }
+
+    // public method returning the content stored under a hash, free of gas since of type view
+    function getStr(bytes32 ref) public view returns (string memory){
+        require(refKnown[ref], "unknown ref");
+        return strByRef[ref];
+    }
+
+    // public method returning the number of distinct strings, free of gas since of type view
+    function refCount() public view returns (uint256){
+        return refList.length;
+    }
+
+    // public method returning up to limit hashes starting at offset, bounded in gas and response size
+    function getRefRange(uint256 offset, uint256 limit) public view returns (bytes32[] memory){
+        uint256 count = refList.length;
+        if (offset >= count) {
+            return new bytes32[](0);
+        }
+
+        // cut the page at the end of the list, written to avoid an overflow of offset + limit
+        if (limit > count - offset) {
+            limit = count - offset;
+        }
+
+        bytes32[] memory page = new bytes32[](limit);
+        for (uint256 i = 0; i < limit; i++) {
+            page[i] = refList[offset + i];
+        }
+        return page;
+    }
+
+    // public method returning the contents of up to limit hashes starting at offset, bounded in gas and response size
+    function getStrByRefRange(uint256 offset, uint256 limit) public view returns (string[] memory){
+        bytes32[] memory refs = getRefRange(offset, limit);
+
+        string[] memory page = new string[](refs.length);
+        for (uint256 i = 0; i < refs.length; i++) {
+            page[i] = strByRef[refs[i]];
+        }
+        return page;
+    }
 }
\ No newline at end of file
@@ -1,6 +1,9 @@
 import json
+import os
 import time
-from typing import Mapping
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from typing import Iterator, List, Mapping
 from retry import retry
 import requests
 
@@ -9,6 +12,11 @@ from web3 import Web3
 from web3.middleware import construct_sign_and_send_raw_middleware
 from web3.middleware import geth_poa_middleware
 
+from abi_fast import decode_bytes32_array, decode_string_array
+from bloom_filter import BloomFilter
+from rpc_balancer import BalancedHTTPProvider
+from tx_tracker import TransactionTracker
+
 
 def print_with_frame(message) -> None:
     """
@@ -25,12 +33,144 @@ def print_with_frame(message) -> None:
     print(f"{' ' * 20}+{'-' * (message_length + 2)}+")
 
 
+class HttpOracle:
+    """
+        Calls the REST-API of the Oracle deployed with the blockchain network
+    """
+
+    def __init__(self, url, rest_header):
+        """
+        Creates instance of HttpOracle
+        Args:
+            url: URL of the Oracle's REST-API
+            rest_header: REST header sent with each request
+        """
+        self.__url = url
+        self.__rest_header = rest_header
+
+    def status(self) -> None:
+        """
+        Raises an Exception if the blockchain is not ready yet
+        Returns: None
+        """
+
+        # check with oracle if blockchain is ready for requests
+        response = requests.get(
+            url=f"{self.__url}/status",
+            headers=self.__rest_header,
+            timeout=10
+        )
+
+        # raise Exception if status is not successful
+        response.raise_for_status()
+
+    def faucet(self, address) -> None:
+        """
+        Requests funds for the address
+        Args:
+            address: public wallet address to fund
+
+        Returns: None
+
+        """
+
+        # call oracle's faucet by Http post request
+        response = requests.post(
+            url=f"{self.__url}/faucet",
+            json={f"address": address},
+            headers=self.__rest_header,
+            timeout=20
+        )
+
+        # raise Exception if status is not successful
+        response.raise_for_status()
+
+    def lease(self):
+        """
+        Leases an account prefunded in the genesis
+        Returns: Dict with private key, address and lease duration, None if the pool is exhausted
+        """
+
+        response = requests.post(
+            url=f"{self.__url}/lease",
+            headers=self.__rest_header,
+            timeout=10
+        )
+
+        # pool is exhausted
+        if response.status_code == 404:
+            return None
+
+        # raise Exception if status is not successful
+        response.raise_for_status()
+
+        return response.json()
+
+    def renew(self, address) -> None:
+        """
+        Extends the lease of an account
+        Args:
+            address: public wallet address of the leased account
+
+        Returns: None
+
+        """
+
+        response = requests.post(
+            url=f"{self.__url}/renew",
+            json={f"address": address},
+            headers=self.__rest_header,
+            timeout=10
+        )
+
+        # raise Exception if status is not successful, the lease expired and the account may be leased again
+        response.raise_for_status()
+
+    def release(self, address) -> None:
+        """
+        Returns a leased account to the pool
+        Args:
+            address: public wallet address of the leased account
+
+        Returns: None
+
+        """
+
+        response = requests.post(
+            url=f"{self.__url}/release",
+            json={f"address": address},
+            headers=self.__rest_header,
+            timeout=10
+        )
+
+        # raise Exception if status is not successful
+        response.raise_for_status()
+
+    def contract(self) -> dict:
+        """
+        Requests header file and address of the deployed chain code
+        Returns: Dict with abi and address
+        """
+
+        response = requests.get(
+            url=f"{self.__url}/contract",
+            headers=self.__rest_header,
+            timeout=20
+        )
+
+        # raise Exception if status is not successful
+        response.raise_for_status()
+
+        # convert response to json to extract the abi and address
+        return response.json()
+
+
 class Blockchain:
     """
         Handles interaction with Oracle and Non-Validator Node of Blockchain Network
     """
 
-    # static ip address of non-validator node with RPC-API
+    # static ip address of first non-validator node with RPC-API
     __rpc_url = "http://localhost:8545"
 
     # static ip address of oracle with REST-API
@@ -42,28 +182,96 @@ class Blockchain:
         'Accept': 'application/json'
     }
 
-    def __init__(self):
+    def __init__(self, rpc_urls: List[str] = None, strategy="least_outstanding", provider=None, oracle=None,
+                 lease_account=True, stuck_blocks=3, content_addressed=False):
+        """
+        Creates instance of Blockchain, balancing all reads and writes across the given non-validator nodes.
+        Args:
+            rpc_urls: URLs of the non-validator nodes with RPC-API, defaults to the first node
+            strategy: Selection of the node per request, either 'least_outstanding' or 'least_latency'
+            provider: Optional web3 provider used instead of the non-validator nodes, e.g. of a SimulatedChain
+            oracle: Optional Oracle interface used instead of the REST-API, e.g. of a SimulatedChain
+            lease_account: Lease an account prefunded in the genesis from the Oracle, falls back to a new account
+                funded by the faucet if the pool is exhausted
+            stuck_blocks: Number of blocks without inclusion after which a transaction is resubmitted with a bumped
+                gas price
+            content_addressed: Store each distinct string once by its hash, duplicates known to the client are
+                resolved without a transaction
+        """
 
         print_with_frame("BLOCKCHAIN INITIALIZATION: START")
 
+        # URLs of all non-validator nodes with RPC-API
+        self.__rpc_urls = rpc_urls or [self.__rpc_url]
+
+        # selection strategy of the load balancing web3 provider
+        self.__strategy = strategy
+
+        # injected web3 provider, replaces the non-validator nodes
+        self.__provider = provider
+
+        # interface of the Oracle, its REST-API unless injected
+        self.__oracle = oracle or HttpOracle(self.__oracle_url, self.__rest_header)
+
         # randomly generated private key, needed to sign transaction
         self.__private_key = str()
 
         # public wallet address generated from the private key
         self.__acc_address = str()
 
-        # generate randomized primary key
-        self.__acc = self.__create_account()
+        # true if the account was leased from the Oracle's pool of prefunded accounts
+        self.__leased = False
 
-        # configure web3 objects for using Proof-of-Authority
-        self.__web3 = self.__initialize_web3()
+        # seconds the Oracle keeps the lease without a renewal, and when it was last renewed
+        self.__lease_ttl = None
+        self.__lease_renewed_at = None
+
+        # strings are stored once by their keccak256 hash instead of appended to the list
+        self.__content_addressed = content_addressed
+
+        # hashes of the strings known to be stored, seeded from the ledger and updated with each own write
+        self.__known_refs = None
+
+        # hashes confirmed to be stored by an own write or by the chain code, strings are never removed so these are
+        # trusted without a call
+        self.__stored_refs = set()
+
+        # number of writes resolved as duplicates without a transaction
+        self.__skipped_writes = 0
 
         # call Oracle to sense if blockchain is ready
         print(f"{'-' * 25} CONNECT TO ORACLE {'-' * 25}")
         self.__wait_for_blockchain()
 
-        # request ETH funds for creating transactions, paying gas
-        self.__request_funds_from_oracle()
+        # lease prefunded account or generate randomized primary key
+        self.__acc = self.__create_account(lease_account)
+
+        try:
+            self.__run(stuck_blocks)
+        except BaseException:
+            # the caller never gets the instance to release the lease itself
+            self.release_account()
+            raise
+
+    def __run(self, stuck_blocks) -> None:
+        """
+        Connects to the chain code with the created account and runs the testing iterations
+        Args:
+            stuck_blocks: Number of blocks without inclusion after which a transaction is resubmitted
+
+        Returns: None
+
+        """
+
+        # configure web3 objects for using Proof-of-Authority
+        self.__web3 = self.__initialize_web3()
+
+        # awaits each transaction, resubmitting it with the same nonce while it is stuck in the txpool
+        self.__tracker = TransactionTracker(self.__web3, self.__private_key, stuck_blocks=stuck_blocks)
+
+        # request ETH funds for creating transactions, paying gas, leased accounts are funded in the genesis
+        if not self.__leased:
+            self.__request_funds_from_oracle()
 
         # check if funds were assigned by checking directly with blockchain
         self.verify_balance()
@@ -71,6 +279,10 @@ class Blockchain:
         # request contract address and header from Oracle
         self.__contract_obj = self.__get_contract_from_oracle()
 
+        # load the hashes of all stored strings for resolving duplicates locally
+        if self.__content_addressed:
+            self.__seed_known_refs()
+
         # access all public methods of the deployed chain code
         self.__testing()
 
@@ -92,23 +304,19 @@ class Blockchain:
         """
 
         # check with oracle if blockchain is ready for requests
-        response = requests.get(
-            url=f"{self.__oracle_url}/status",
-            headers=self.__rest_header,
-            timeout=10
-        )
-
-        # raise Exception if status is not successful
-        response.raise_for_status()
+        self.__oracle.status()
 
         return print(f"ORACLE: Blockchain is ready")
 
     def __initialize_web3(self):
-        web3 = Web3(Web3.HTTPProvider(self.__rpc_url))
+        web3 = Web3(self.__provider or BalancedHTTPProvider(self.__rpc_urls, strategy=self.__strategy))
         web3.middleware_onion.inject(geth_poa_middleware, layer=0)
         web3.middleware_onion.add(construct_sign_and_send_raw_middleware(self.__acc))
         web3.eth.default_account = self.__acc_address
-        print(f"CLIENT: Web3 is configured for PoA")
+        if self.__provider:
+            print(f"CLIENT: Web3 is configured for PoA with injected provider")
+        else:
+            print(f"CLIENT: Web3 is configured for PoA with {len(self.__rpc_urls)} RPC node(s)")
         return web3
 
     @retry((Exception, requests.exceptions.HTTPError), tries=3, delay=4)
@@ -119,16 +327,8 @@ class Blockchain:
 
         """
 
-        # call oracle's faucet by Http post request
-        response = requests.post(
-            url=f"{self.__oracle_url}/faucet",
-            json={f"address": self.__acc_address},
-            headers=self.__rest_header,
-            timeout=20
-        )
-
-        # raise Exception if status is not successful
-        response.raise_for_status()
+        # call oracle's faucet
+        self.__oracle.faucet(self.__acc_address)
 
         return print(f"ORACLE: Received 500 ETH", flush=True)
 
@@ -139,17 +339,8 @@ class Blockchain:
         Returns: Web3 Contract object
         """
 
-        response = requests.get(
-            url=f"{self.__oracle_url}/contract",
-            headers=self.__rest_header,
-            timeout=20
-        )
-
-        # raise Exception if status is not successful
-        response.raise_for_status()
-
-        # convert response to json to extract the abi and address
-        json_response = response.json()
+        # request abi and address of the deployed chain code
+        json_response = self.__oracle.contract()
 
         print(f"ORACLE: Initialized chain code: {json_response.get('address')}")
 
@@ -159,16 +350,42 @@ class Blockchain:
             address=json_response.get("address")
         )
 
-    def __create_account(self):
+    @retry((Exception, requests.exceptions.HTTPError), tries=3, delay=4)
+    def __lease_account_from_oracle(self):
         """
-        Generates randomized primary key and derives public account from it
-        Returns: None
+        Leases an account prefunded in the genesis from the Oracle
+        Returns: Account object, None if the pool is exhausted
+
+        """
+        leased = self.__oracle.lease()
+
+        if leased is None:
+            print(f"ORACLE: Account pool is exhausted")
+            return None
+
+        # an Oracle without lease expiry sends no duration
+        self.__lease_ttl = leased.get("ttl")
+        self.__lease_renewed_at = time.monotonic()
+
+        return Account.from_key("0x" + leased["private_key"])
+
+    def __create_account(self, lease_account):
+        """
+        Leases prefunded account or generates randomized primary key and derives public account from it
+        Args:
+            lease_account: Try to lease a prefunded account first
+
+        Returns: Account object
 
         """
         print(f"{'-' * 25} REGISTER WORKING NODE {'-' * 25}")
 
+        # lease prefunded account, avoiding the faucet transaction
+        acc = self.__lease_account_from_oracle() if lease_account else None
+        self.__leased = acc is not None
+
         # generate random private key, address, public address
-        acc = Account.create()
+        acc = acc or Account.create()
 
         # initialize web3 utility object
         web3 = Web3()
@@ -179,11 +396,37 @@ class Blockchain:
         # convert address type, used in raw transactions
         self.__acc_address = web3.to_checksum_address(acc.address)
 
-        print(f"CLIENT: Account address: {self.__acc_address}")
+        print(f"CLIENT: {'Leased account' if self.__leased else 'Account'} address: {self.__acc_address}")
 
         # return generated account
         return acc
 
+    def __renew_lease(self) -> None:
+        """
+        Renews a leased account once half of the lease duration passed, a killed client stops renewing and its
+        account returns to the pool
+        Returns: None
+
+        """
+        if not self.__leased or self.__lease_ttl is None:
+            return
+
+        if time.monotonic() - self.__lease_renewed_at < self.__lease_ttl / 2:
+            return
+
+        self.__oracle.renew(self.__acc_address)
+        self.__lease_renewed_at = time.monotonic()
+
+    def release_account(self) -> None:
+        """
+        Returns a leased account to the Oracle's pool, the client must not send transactions afterwards
+        Returns: None
+
+        """
+        if self.__leased:
+            self.__oracle.release(self.__acc_address)
+            self.__leased = False
+
     def verify_balance(self) -> int:
         """
         Calls blockchain directly for requesting current balance
@@ -210,40 +453,223 @@ class Blockchain:
 
         """
 
-        # transaction is signed with private key
-        signed_transaction = self.__web3.eth.account.sign_transaction(trx_hash, private_key=self.__private_key)
+        # transaction is signed, sent and resubmitted with a bumped gas price until validated by the validator nodes
+        outcome = self.__tracker.send(trx_hash)
+
+        # nonce was consumed by another transaction of the same account
+        if outcome.status == "dropped":
+            raise RuntimeError(f"Transaction with nonce {trx_hash['nonce']} was dropped")
 
-        # confirmation that transaction was passed from non-validator node to validator nodes
-        executed_transaction = self.__web3.eth.send_raw_transaction(signed_transaction.rawTransaction)
+        if outcome.status == "replaced":
+            print(f"BLOCKCHAIN: Transaction replaced after {len(outcome.tx_hashes) - 1} fee bump(s), "
+                  f"paid {self.__web3.from_wei(outcome.gas_price, 'gwei')} gwei")
 
-        # non-validator node awaited the successful validation by validation nodes and returns receipt
-        transaction_receipt = self.__web3.eth.wait_for_transaction_receipt(executed_transaction)
+        return outcome.receipt
 
-        return transaction_receipt
+    def __call_string_array(self, fn_name, args, block_identifier, lazy=False):
+        """
+        Calls a 'view' method of chain code returning string[], decoding the raw result with the fast decoder
+        Args:
+            fn_name: Name of the method
+            args: Arguments of the method
+            block_identifier: Block the method is called at
+            lazy: Decode each string on access instead of all at once
+
+        Returns: list of str, or LazyStringArray if lazy
+
+        """
+        return decode_string_array(self.__call_raw(fn_name, args, block_identifier), lazy=lazy)
+
+    def __call_raw(self, fn_name, args, block_identifier) -> bytes:
+        """
+        Calls a 'view' method of chain code without decoding its result
+        Args:
+            fn_name: Name of the method
+            args: Arguments of the method
+            block_identifier: Block the method is called at
+
+        Returns: ABI encoded result
+
+        """
+        return self.__web3.eth.call({
+            "from": self.__acc_address,
+            "to": self.__contract_obj.address,
+            "data": self.__contract_obj.encodeABI(fn_name=fn_name, args=args)
+        }, block_identifier)
 
     @retry(Exception, tries=3, delay=4)
-    def get_stored_strings_from_ledger(self) -> list:
+    def get_stored_strings_from_ledger(self, lazy=False) -> list:
         """
         Reads all strings stored by chain code
+        :param lazy: decode each string on access instead of all at once
         :return: list of str
         """
 
-        # Call public 'view' method of chain code
-        str_lst = self.__contract_obj.functions.getStrList().call({
-            "from": self.__acc_address,
-            "gasPrice": self.__web3.to_wei("1", "gwei")
-        })
+        # stored strings are only reachable by their hashes, a single page without limit holds all of them, the chain
+        # code cuts the limit at the number of hashes
+        if self.__content_addressed:
+            str_lst = self.__call_string_array("getStrByRefRange", [0, 2 ** 256 - 1], "latest", lazy=lazy)
+        else:
+            # Call public 'view' method of chain code
+            str_lst = self.__call_string_array("getStrList", [], "latest", lazy=lazy)
 
         print(f"Blockchain: getStrList => {str_lst}")
         return str_lst
 
+    @retry(Exception, tries=3, delay=4)
+    def __get_str_range(self, offset, limit, block_identifier) -> list:
+        """
+        Reads a single page of strings stored by chain code
+        Args:
+            offset: Index of the first string
+            limit: Maximum number of strings
+            block_identifier: Block the page is read at
+
+        Returns: list of str
+
+        """
+        fn_name = "getStrByRefRange" if self.__content_addressed else "getStrRange"
+        return self.__call_string_array(fn_name, [offset, limit], block_identifier)
+
+    @retry(Exception, tries=3, delay=4)
+    def __get_ref_range(self, offset, limit, block_identifier) -> list:
+        """
+        Reads a single page of hashes of the strings stored by chain code
+        Args:
+            offset: Index of the first hash
+            limit: Maximum number of hashes
+            block_identifier: Block the page is read at
+
+        Returns: list of bytes
+
+        """
+        return decode_bytes32_array(self.__call_raw("getRefRange", [offset, limit], block_identifier))
+
+    def __seed_known_refs(self, page_size=5000) -> None:
+        """
+        Loads the hashes of all stored strings into a Bloom filter, sized for twice the current number of strings
+        Args:
+            page_size: Number of hashes read per call
+
+        Returns: None
+
+        """
+
+        # pin the block, the filter reflects the ledger at a single point in time
+        block_identifier = self.__web3.eth.block_number
+        count = self.__contract_obj.functions.refCount().call({
+            "from": self.__acc_address
+        }, block_identifier=block_identifier)
+
+        self.__known_refs = BloomFilter(capacity=max(100000, 2 * count))
+        for offset in range(0, count, page_size):
+            for ref in self.__get_ref_range(offset, page_size, block_identifier):
+                self.__known_refs.add(ref)
+
+        print(f"BLOCKCHAIN: Loaded {count} hashes of stored strings")
+
+    def __is_stored(self, ref) -> bool:
+        """
+        Checks if a string is stored, hashes confirmed before are answered locally, any other hit of the Bloom filter
+        is confirmed by the chain code once
+        Args:
+            ref: keccak256 hash of the string
+
+        Returns: True if stored, False if unknown to the client
+
+        """
+        if ref in self.__stored_refs:
+            return True
+
+        if ref not in self.__known_refs:
+            return False
+
+        # rule out false positives of the filter
+        stored = self.__contract_obj.functions.hasStr(ref).call({"from": self.__acc_address})
+        if stored:
+            self.__stored_refs.add(ref)
+
+        return stored
+
+    @property
+    def skipped_writes(self) -> int:
+        """
+        Returns: Number of writes resolved as duplicates without a transaction
+        """
+        return self.__skipped_writes
+
+    def iter_stored_strings(self, page_size=1000, prefetch=0, block_identifier=None) -> Iterator[str]:
+        """
+        Lazily walks all strings stored by chain code page by page, holding at most prefetch + 1 pages in memory
+        Args:
+            page_size: Number of strings read per call, bounded by the node's gas cap and response size
+            prefetch: Number of pages requested ahead in background threads while the current one is consumed
+            block_identifier: Block all pages are read at, defaults to the current head so the pages are consistent
+
+        Returns: Iterator of str
+
+        """
+
+        # pin the block, strings added during the walk neither shift nor duplicate pages
+        if block_identifier is None:
+            block_identifier = self.__web3.eth.block_number
+
+        count_fn = self.__contract_obj.functions.refCount if self.__content_addressed else \
+            self.__contract_obj.functions.strCount
+        count = count_fn().call({
+            "from": self.__acc_address
+        }, block_identifier=block_identifier)
+
+        offsets = iter(range(0, count, page_size))
+
+        if prefetch <= 0:
+            for offset in offsets:
+                yield from self.__get_str_range(offset, page_size, block_identifier)
+            return
+
+        with ThreadPoolExecutor(max_workers=prefetch) as executor:
+            # pages in flight, in the order they are consumed
+            pages = deque(executor.submit(self.__get_str_range, offset, page_size, block_identifier)
+                          for _, offset in zip(range(prefetch), offsets))
+
+            try:
+                while pages:
+                    page = pages.popleft().result()
+
+                    # refill the pipeline before handing out the page
+                    offset = next(offsets, None)
+                    if offset is not None:
+                        pages.append(executor.submit(self.__get_str_range, offset, page_size, block_identifier))
+
+                    yield from page
+            finally:
+                # consumer stopped early, pages not started yet are not requested anymore
+                for future in pages:
+                    future.cancel()
+
     def post_string_to_ledger(self, word: str) -> json:
         """
-        Push string to list on chain code
+        Push string to list on chain code, in content-addressed mode only if it is not stored yet
         :param word: single string
-        :return: json of transaction receipt
+        :return: json of transaction receipt, None if the string was already stored
         """
-        unsigned_trx = self.__contract_obj.functions.addStr(word).build_transaction(
+        if self.__content_addressed:
+            ref = Web3.keccak(text=word)
+
+            # known duplicate, nothing to write
+            if self.__is_stored(ref):
+                self.__skipped_writes += 1
+                print(f"Blockchain: '{word}' is already stored, skipped transaction")
+                return None
+
+            function = self.__contract_obj.functions.addStrRef(word)
+        else:
+            function = self.__contract_obj.functions.addStr(word)
+
+        # keep the account for the next transactions
+        self.__renew_lease()
+
+        unsigned_trx = function.build_transaction(
             {
                 "chainId": self.__web3.eth.chain_id,
                 "from": self.__acc_address,
@@ -258,6 +684,11 @@ class Blockchain:
         # sign transaction with primary key and execute
         conf = self.__sign_and_deploy(unsigned_trx)
 
+        # own write is known without reading the ledger again
+        if self.__content_addressed:
+            self.__known_refs.add(ref)
+            self.__stored_refs.add(ref)
+
         # convert response from chain code to json
         json_response = self.__web3.to_json(conf)
 
@@ -290,4 +721,9 @@ class Blockchain:
 
 
 if __name__ == "__main__":
-    b = Blockchain()
+    # comma separated URLs of the non-validator nodes, e.g. http://localhost:8545,http://localhost:8546
+    urls = os.environ.get("RPC_URLS")
+    b = Blockchain(rpc_urls=urls.split(",") if urls else None)
+
+    # return the leased account to the pool for the next client
+    b.release_account()
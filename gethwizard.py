@@ -0,0 +1,260 @@
+import argparse
+import json
+import os
+import sys
+from datetime import datetime
+
+from profiles import PROFILES
+
+# modules of the repository are imported by the subcommands from the repository root
+ROOT_DIR = os.path.dirname(os.path.abspath(__file__))
+
+# heavy modules (web3, eth_account, eth_keys, solcx, flask, requests) are imported by the subcommand needing them,
+# parsing the command line and printing the help imports nothing but the standard library
+
+
+def deploy(args) -> int:
+    """
+    Deploys a new network, scales out, stops or restarts a running one
+    Args:
+        args: Parsed command line arguments
+
+    Returns: Exit code
+
+    """
+    from blockchain_deployer import BlockchainDeployer
+
+    # the deployer resolves relative folders against the repository root when calling docker compose
+    config_dir = args.config_dir or os.path.join("deployments", datetime.now().strftime("%Y-%m-%d_%H-%M"))
+    config_dir = os.path.abspath(config_dir)
+
+    if args.stop:
+        BlockchainDeployer.stop(config_dir)
+    elif args.restart:
+        BlockchainDeployer.restart(config_dir)
+    else:
+        BlockchainDeployer(
+            n_validator=args.validators,
+            n_rpc=args.rpcs,
+            n_accounts=args.accounts,
+            profile=args.profile,
+            seed=args.seed,
+            config_dir=config_dir,
+            boot=not args.no_boot,
+            incremental=args.incremental,
+            rpc_proxy=args.rpc_proxy
+        )
+        print(f"Deployment written to {config_dir}")
+
+    return 0
+
+
+def oracle(args) -> int:
+    """
+    Runs the Oracle's REST-API outside of docker against a deployed network
+    Args:
+        args: Parsed command line arguments
+
+    Returns: Exit code
+
+    """
+    from oracle import app as oracle_app
+
+    # the Oracle reads the non-validator nodes from the envs, as inside of docker
+    if args.rpc_urls:
+        os.environ["RPC_URLS"] = args.rpc_urls
+
+    # routes of the REST-API serve the module's Oracle instance
+    oracle_app.oracle = oracle_app.Oracle(
+        private_key=args.private_key,
+        source_path=os.path.join(ROOT_DIR, "chaincode", "chaincode.sol"),
+        cache_path=os.path.join(ROOT_DIR, "chaincode", "compiled_code.json")
+    )
+
+    oracle_app.app.run(debug=False, host=args.host, port=args.port)
+    return 0
+
+
+def client(args) -> int:
+    """
+    Runs the testing client against a deployed network or an in-process chain
+    Args:
+        args: Parsed command line arguments
+
+    Returns: Exit code
+
+    """
+    from client import Blockchain
+
+    if args.simulated:
+        from simulated_chain import SimulatedChain
+
+        chain = SimulatedChain(profile=args.profile)
+        blockchain = Blockchain(provider=chain.provider, oracle=chain.oracle, stuck_blocks=args.stuck_blocks,
+                                content_addressed=args.content_addressed)
+    else:
+        blockchain = Blockchain(
+            rpc_urls=args.rpc_urls.split(",") if args.rpc_urls else None,
+            strategy=args.strategy,
+            lease_account=not args.no_lease,
+            stuck_blocks=args.stuck_blocks,
+            content_addressed=args.content_addressed
+        )
+
+    # return the leased account to the pool for the next client, a failed run releases it itself
+    blockchain.release_account()
+
+    return 0
+
+
+def bench(args) -> int:
+    """
+    Runs the offline microbenchmarks or the import time check
+    Args:
+        args: Parsed command line arguments
+
+    Returns: Exit code, 1 on regressions
+
+    """
+    if args.imports:
+        from benchmarks import importtime_check
+        return importtime_check.main(args.extra_args)
+
+    from benchmarks import bench_hot_paths
+    return bench_hot_paths.main(args.extra_args)
+
+
+def status(args) -> int:
+    """
+    Prints head, peers and txpool of a non-validator node, the Oracle's state and the stored deployment
+    Args:
+        args: Parsed command line arguments
+
+    Returns: Exit code, 1 if the node or the Oracle is not responding
+
+    """
+    import requests
+
+    healthy = True
+
+    if args.config_dir:
+        with open(os.path.join(args.config_dir, "deployment.json"), "r") as file:
+            state = json.load(file)
+        print(f"DEPLOYMENT: profile {state['profile']}, {len(state['validators'])} validator(s), "
+              f"{len(state['rpcs'])} RPC node(s), {len(state['accounts'])} pooled account(s), "
+              f"subnet {state['subnet']}{', caching proxy' if state.get('rpc_proxy') else ''}")
+
+    session = requests.Session()
+
+    def call(method):
+        response = session.post(args.rpc, json={"jsonrpc": "2.0", "method": method, "id": 1, "params": []},
+                                timeout=5)
+        response.raise_for_status()
+        return response.json()["result"]
+
+    try:
+        head, peers, txpool = call("eth_blockNumber"), call("net_peerCount"), call("txpool_status")
+        print(f"RPC: {args.rpc} at block {int(head, 16)}, {int(peers, 16)} peer(s), {int(txpool['pending'], 16)} "
+              f"pending and {int(txpool['queued'], 16)} queued transaction(s)")
+    except (requests.exceptions.RequestException, KeyError) as e:
+        print(f"RPC: {args.rpc} is not responding ({e})")
+        healthy = False
+
+    try:
+        session.get(f"{args.oracle}/status", timeout=5).raise_for_status()
+        print(f"ORACLE: {args.oracle} is ready")
+    except requests.exceptions.RequestException as e:
+        print(f"ORACLE: {args.oracle} is not ready ({e})")
+        healthy = False
+
+    return 0 if healthy else 1
+
+
+def build_parser() -> argparse.ArgumentParser:
+    """
+    Creates the parser of all subcommands
+    Returns: Argument parser
+
+    """
+    parser = argparse.ArgumentParser(prog="gethwizard", description="Deploys and drives private geth networks")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    sub = subparsers.add_parser("deploy", help="deploy, scale out, stop or restart a network")
+    sub.add_argument("--validators", type=int, default=3, help="number of (new) validator nodes")
+    sub.add_argument("--rpcs", type=int, default=1, help="number of (new) non-validator nodes with RPC-API")
+    sub.add_argument("--accounts", type=int, default=10, help="number of client accounts prefunded in the genesis")
+    sub.add_argument("--profile", choices=tuple(PROFILES), default=None,
+                     help="tuning profile of the network, defaults to 'default' or the profile of --incremental")
+    sub.add_argument("--seed", default=None, help="seed for reproducible key material")
+    sub.add_argument("--config-dir", default=None, help="deployment folder, defaults to deployments/<timestamp>")
+    sub.add_argument("--rpc-proxy", action="store_true", help="add the caching JSON-RPC proxy")
+    sub.add_argument("--no-boot", action="store_true", help="only write the configuration files")
+    action = sub.add_mutually_exclusive_group()
+    action.add_argument("--incremental", action="store_true", help="scale out the deployment in --config-dir")
+    action.add_argument("--stop", action="store_true", help="stop the deployment in --config-dir")
+    action.add_argument("--restart", action="store_true", help="warm restart the deployment in --config-dir")
+    sub.set_defaults(func=deploy)
+
+    sub = subparsers.add_parser("oracle", help="run the Oracle's REST-API outside of docker")
+    sub.add_argument("--rpc-urls", default=None, help="comma separated URLs of the non-validator nodes")
+    sub.add_argument("--private-key", default=None, help="key of the prefunded account, defaults to PRIVATE_KEY")
+    sub.add_argument("--host", default="0.0.0.0", help="interface the REST-API listens on")
+    sub.add_argument("--port", type=int, default=8081, help="port the REST-API listens on")
+    sub.set_defaults(func=oracle)
+
+    sub = subparsers.add_parser("client", help="run the testing client")
+    sub.add_argument("--rpc-urls", default=os.environ.get("RPC_URLS"),
+                     help="comma separated URLs of the non-validator nodes, defaults to RPC_URLS")
+    sub.add_argument("--strategy", choices=("least_outstanding", "least_latency"), default="least_outstanding",
+                     help="selection of the node per request")
+    sub.add_argument("--no-lease", action="store_true", help="use a new account funded by the faucet")
+    sub.add_argument("--stuck-blocks", type=int, default=3, help="blocks until a transaction is resubmitted")
+    sub.add_argument("--content-addressed", action="store_true", help="store each distinct string only once")
+    sub.add_argument("--simulated", action="store_true", help="run against an in-process chain")
+    sub.add_argument("--profile", choices=tuple(PROFILES), default="default", help="profile of the in-process chain")
+    sub.set_defaults(func=client)
+
+    sub = subparsers.add_parser("bench", help="run the offline microbenchmarks, further arguments are passed "
+                                              "through, e.g. --compare <file>")
+    sub.add_argument("--imports", action="store_true", help="run the import time check instead, e.g. --budget 50")
+    sub.set_defaults(func=bench)
+
+    sub = subparsers.add_parser("status", help="show the state of a running network")
+    sub.add_argument("--rpc", default="http://localhost:8545", help="URL of a non-validator node")
+    sub.add_argument("--oracle", default="http://localhost:8081", help="URL of the Oracle's REST-API")
+    sub.add_argument("--config-dir", default=None, help="deployment folder to summarize")
+    sub.set_defaults(func=status)
+
+    return parser
+
+
+def main(argv=None) -> int:
+    """
+    Entry point of the command line
+    Args:
+        argv: Command line arguments, defaults to sys.argv
+
+    Returns: Exit code
+
+    """
+    parser = build_parser()
+    args, extra_args = parser.parse_known_args(argv)
+
+    # only the benchmarks take arguments of their own
+    if extra_args and args.command != "bench":
+        parser.error(f"unrecognized arguments: {' '.join(extra_args)}")
+
+    # a running deployment is never looked up in a new timestamp folder
+    if args.command == "deploy" and not args.config_dir and (args.incremental or args.stop or args.restart):
+        parser.error("--incremental, --stop and --restart require --config-dir of the running deployment")
+    args.extra_args = extra_args
+
+    # modules of the repository root are importable no matter the working directory
+    if ROOT_DIR not in sys.path:
+        sys.path.insert(0, ROOT_DIR)
+
+    return args.func(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,113 @@
+import os
+from concurrent.futures import ProcessPoolExecutor
+from typing import List, NamedTuple
+
+from eth_keys import keys
+from eth_utils import keccak
+
+# order of the secp256k1 curve, valid private keys lie in [1, order - 1]
+SECP256K1_ORDER = 0xFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFEBAAEDCE6AF48A03BBFD25E8CD0364141
+
+# below this number of identities the startup of a process pool costs more than the derivation itself
+PARALLEL_THRESHOLD = 64
+
+
+class Identity(NamedTuple):
+    """
+        Key material of a single account or node
+    """
+
+    # private key as hex string without 0x prefix
+    private_key: str
+
+    # public key as hex string without 0x prefix, used as enode id
+    public_key: str
+
+    # checksum wallet address derived from the public key
+    address: str
+
+
+def _is_valid_secret(secret: bytes) -> bool:
+    """
+    Checks if the secret can be used as secp256k1 private key
+    Args:
+        secret: 32 bytes candidate private key
+
+    Returns: True if valid False otherwise
+
+    """
+    return 0 < int.from_bytes(secret, "big") < SECP256K1_ORDER
+
+
+def _create_secret(seed: bytes | None, index: int) -> bytes:
+    """
+    Creates a private key, either randomly or derived from the seed and the index of the identity
+    Args:
+        seed: Optional seed for reproducible key material
+        index: Position of the identity in the batch
+
+    Returns: 32 bytes private key
+
+    """
+    if seed is None:
+        secret = os.urandom(32)
+    else:
+        secret = keccak(seed + index.to_bytes(8, "big"))
+
+    # rehash the unlikely candidates outside the curve order
+    while not _is_valid_secret(secret):
+        secret = keccak(secret)
+
+    return secret
+
+
+def _derive_identities(secrets: List[bytes]) -> List[Identity]:
+    """
+    Derives public key and address of each private key, executed in worker processes
+    Args:
+        secrets: Private keys to derive identities from
+
+    Returns: Identities in the same order as the secrets
+
+    """
+    identities = list()
+
+    for secret in secrets:
+        public_key = keys.PrivateKey(secret).public_key
+        identities.append(Identity(
+            private_key=secret.hex(),
+            public_key=public_key.to_hex()[2:],
+            address=public_key.to_checksum_address()
+        ))
+
+    return identities
+
+
+def generate_identities(n, seed=None, processes=None, start=0) -> List[Identity]:
+    """
+    Generates the key material of n identities in one batch, deriving public keys across a process pool
+    Args:
+        n: Number of identities to generate
+        seed: Optional seed (str, int or bytes), generating the same identities bit-for-bit on every run
+        processes: Number of worker processes, defaults to the number of CPUs
+        start: Index of the first identity, continues a seeded batch without repeating its identities
+
+    Returns: List of generated identities
+
+    """
+    if seed is not None and not isinstance(seed, bytes):
+        seed = str(seed).encode()
+
+    # creating the private keys is cheap, only the derivation of the public keys is distributed
+    secrets = [_create_secret(seed, index) for index in range(start, start + n)]
+
+    processes = processes or os.cpu_count() or 1
+    if n < PARALLEL_THRESHOLD or processes == 1:
+        return _derive_identities(secrets)
+
+    # split secrets into one contiguous chunk per worker, preserving their order
+    chunk_size = -(-n // processes)
+    chunks = [secrets[offset:offset + chunk_size] for offset in range(0, n, chunk_size)]
+
+    with ProcessPoolExecutor(max_workers=processes) as executor:
+        return [identity for chunk in executor.map(_derive_identities, chunks) for identity in chunk]
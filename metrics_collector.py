@@ -0,0 +1,265 @@
+import argparse
+import json
+import statistics
+import time
+from typing import Iterable, List
+
+import requests
+
+# gauges sampled from geth's metrics endpoint
+DEFAULT_METRIC_KEYS = ("p2p/peers", "txpool/pending", "txpool/queued", "chain/head/block")
+
+
+class MetricsCollector:
+    """
+        Samples block headers, txpool and peers of a deployed network into a compact time-series file
+    """
+
+    # static REST header for JSON-RPC requests
+    __rest_header = {
+        'Content-type': 'application/json',
+        'Accept': 'application/json'
+    }
+
+    def __init__(self, rpc_url, output_path, metrics_url=None, metric_keys: Iterable[str] = DEFAULT_METRIC_KEYS):
+        """
+        Creates instance of MetricsCollector
+        Args:
+            rpc_url: URL of a non-validator node with RPC-API
+            output_path: JSON lines file the samples are appended to
+            metrics_url: Optional URL of the node's metrics endpoint, e.g. http://localhost:6060
+            metric_keys: Gauges taken from the metrics endpoint
+        """
+        self.__rpc_url = rpc_url
+        self.__output_path = output_path
+        self.__metrics_url = metrics_url
+        self.__metric_keys = tuple(metric_keys)
+
+        # keep-alive session, sampling opens no new connection per request
+        self.__session = requests.Session()
+
+        # id of the JSON-RPC filter reporting transactions entering the txpool
+        self.__filter_id = None
+
+        # point in time each pending transaction was first seen, removed once included in a block
+        self.__first_seen = dict()
+
+        # number of the last block written to the file, None until the first sample
+        self.__last_block = None
+
+    def __call(self, method, params=None):
+        """
+        Executes a single JSON-RPC request
+        Args:
+            method: RPC method
+            params: Parameters of the RPC method
+
+        Returns: Result of the request
+
+        """
+        response = self.__session.post(
+            url=self.__rpc_url,
+            json={"jsonrpc": "2.0", "method": method, "id": 1, "params": params or []},
+            headers=self.__rest_header,
+            timeout=10
+        )
+
+        # raise Exception if status is an error one
+        response.raise_for_status()
+
+        body = response.json()
+        if "error" in body:
+            raise RuntimeError(f"{method} failed: {body['error'].get('message')}")
+
+        return body["result"]
+
+    def __poll_pending(self, now) -> None:
+        """
+        Records the first time each new pending transaction was seen by the node
+        Args:
+            now: Time of the current sample
+
+        Returns: None
+
+        """
+        try:
+            if self.__filter_id is None:
+                self.__filter_id = self.__call("eth_newPendingTransactionFilter")
+            hashes = self.__call("eth_getFilterChanges", [self.__filter_id])
+        except RuntimeError:
+            # filter expired on the node, it is recreated with the next sample
+            self.__filter_id = None
+            return
+
+        for tx_hash in hashes:
+            self.__first_seen.setdefault(tx_hash, now)
+
+    def __sample_metrics(self) -> dict:
+        """
+        Reads the selected gauges from the node's metrics endpoint
+        Returns: Dict of gauge values
+
+        """
+        if not self.__metrics_url:
+            return dict()
+
+        response = self.__session.get(url=f"{self.__metrics_url}/debug/metrics", timeout=10)
+        response.raise_for_status()
+        metrics = response.json()
+
+        return {key: metrics[key] for key in self.__metric_keys if key in metrics}
+
+    def sample(self) -> List[dict]:
+        """
+        Takes one sample of the network and appends it, together with all blocks sealed since the last sample, to the
+        output file
+        Returns: Records written to the file
+
+        """
+        now = time.time()
+        self.__poll_pending(now)
+
+        head = int(self.__call("eth_blockNumber"), 16)
+        txpool = self.__call("txpool_status")
+
+        records = [{
+            "type": "sample",
+            "t": round(now, 3),
+            "block": head,
+            "pending": int(txpool["pending"], 16),
+            "queued": int(txpool["queued"], 16),
+            "peers": int(self.__call("net_peerCount"), 16),
+            "metrics": self.__sample_metrics()
+        }]
+
+        # start with the current head, blocks before the collector started are not recorded
+        first = head if self.__last_block is None else self.__last_block + 1
+
+        for number in range(first, head + 1):
+            block = self.__call("eth_getBlockByNumber", [hex(number), False])
+
+            # inclusion delay from the transaction entering the txpool until its block was observed
+            delays = [round(now - self.__first_seen.pop(tx), 3) for tx in block["transactions"] if
+                      tx in self.__first_seen]
+
+            records.append({
+                "type": "block",
+                "t": round(now, 3),
+                "number": number,
+                "timestamp": int(block["timestamp"], 16),
+                "gas_used": int(block["gasUsed"], 16),
+                "gas_limit": int(block["gasLimit"], 16),
+                "txs": len(block["transactions"]),
+                "delays": delays
+            })
+
+        self.__last_block = head
+
+        with open(self.__output_path, "a") as file:
+            for record in records:
+                file.write(json.dumps(record, separators=(",", ":")) + "\n")
+
+        return records
+
+    def run(self, interval=1.0, duration=None) -> None:
+        """
+        Samples the network periodically
+        Args:
+            interval: Seconds between two samples
+            duration: Seconds after which sampling stops, runs until interrupted if None
+
+        Returns: None
+
+        """
+        end = None if duration is None else time.monotonic() + duration
+
+        while end is None or time.monotonic() < end:
+            start = time.monotonic()
+            self.sample()
+            time.sleep(max(0.0, interval - (time.monotonic() - start)))
+
+
+def summarize(path) -> dict:
+    """
+    Aggregates a time-series file into block time, gas fill and inclusion delay per block
+    Args:
+        path: JSON lines file written by MetricsCollector
+
+    Returns: Dict with one entry per block and overall statistics
+
+    """
+    with open(path, "r") as file:
+        records = [json.loads(line) for line in file if line.strip()]
+
+    blocks = [r for r in records if r["type"] == "block"]
+    samples = [r for r in records if r["type"] == "sample"]
+
+    per_block = list()
+    for previous, block in zip([None] + blocks[:-1], blocks):
+        per_block.append({
+            "number": block["number"],
+            "txs": block["txs"],
+            "gas_fill": block["gas_used"] / block["gas_limit"] if block["gas_limit"] else 0.0,
+            "block_time": block["timestamp"] - previous["timestamp"] if previous else None,
+            "mean_delay": statistics.fmean(block["delays"]) if block["delays"] else None
+        })
+
+    delays = sorted(d for block in blocks for d in block["delays"])
+    block_times = [b["block_time"] for b in per_block if b["block_time"] is not None]
+
+    return {
+        "blocks": per_block,
+        "n_blocks": len(blocks),
+        "n_txs": sum(b["txs"] for b in blocks),
+        "mean_block_time": statistics.fmean(block_times) if block_times else None,
+        "mean_gas_fill": statistics.fmean(b["gas_fill"] for b in per_block) if per_block else None,
+        "p50_delay": delays[len(delays) // 2] if delays else None,
+        "p99_delay": delays[min(len(delays) - 1, int(len(delays) * 0.99))] if delays else None,
+        "max_pending": max((s["pending"] for s in samples), default=None),
+        "min_peers": min((s["peers"] for s in samples), default=None)
+    }
+
+
+def print_summary(path) -> None:
+    """
+    Prints the summary of a time-series file as table
+    Args:
+        path: JSON lines file written by MetricsCollector
+
+    Returns: None
+
+    """
+    summary = summarize(path)
+
+    print(f"{'BLOCK':>10} {'TXS':>6} {'GAS FILL':>10} {'BLOCK TIME':>11} {'MEAN DELAY':>11}")
+    for block in summary["blocks"]:
+        block_time = "-" if block["block_time"] is None else f"{block['block_time']}s"
+        mean_delay = "-" if block["mean_delay"] is None else f"{block['mean_delay']:.3f}s"
+        print(f"{block['number']:>10} {block['txs']:>6} {block['gas_fill']:>10.2%} {block_time:>11} {mean_delay:>11}")
+
+    print("*" * 50)
+    for key, value in summary.items():
+        if key != "blocks":
+            print(f"{key}: {value}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Collects and summarizes metrics of a deployed network")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    collect = subparsers.add_parser("collect", help="sample a running network")
+    collect.add_argument("--rpc", default="http://localhost:8545", help="URL of a non-validator node")
+    collect.add_argument("--metrics", default="http://localhost:6060", help="URL of the node's metrics endpoint")
+    collect.add_argument("--output", required=True, help="time-series file, e.g. deployments/<timestamp>/metrics.jsonl")
+    collect.add_argument("--interval", type=float, default=1.0, help="seconds between two samples")
+    collect.add_argument("--duration", type=float, default=None, help="seconds to sample, until interrupted if unset")
+
+    summary = subparsers.add_parser("summary", help="summarize a time-series file")
+    summary.add_argument("path", help="time-series file written by collect")
+
+    args = parser.parse_args()
+
+    if args.command == "collect":
+        MetricsCollector(args.rpc, args.output, metrics_url=args.metrics).run(args.interval, args.duration)
+    else:
+        print_summary(args.path)
@@ -1,19 +1,29 @@
 import os
 import json
+import hashlib
+import threading
+import time
+from collections import deque
 from functools import wraps
-from typing import Mapping
+from typing import Mapping, Tuple
 
 import requests
 from retry import retry
-from solcx import compile_standard, install_solc
+from solcx import compile_standard, get_installed_solc_versions, install_solc
 from web3 import Web3
 from eth_account import Account
 from flask import Flask, jsonify, request
 from web3.middleware import construct_sign_and_send_raw_middleware
 from web3.middleware import geth_poa_middleware
 
+from rpc_balancer import BalancedHTTPProvider
+from tx_tracker import TransactionTracker
+
 app = Flask(__name__)
 
+# compiler version of the chain code, downloaded on first use
+SOLC_VERSION = "0.8.22"
+
 
 def error_handler(func):
     """ Adds default status and header to all REST responses used for Oracle"""
@@ -28,17 +38,165 @@ def error_handler(func):
     return wrapper
 
 
+def load_compiler_cache(source, cache_path) -> dict | None:
+    """
+    Loads the cached compiler output of a source
+    Args:
+        source: Content of the solidity file
+        cache_path: Path of the cached compiler output
+
+    Returns: Compiler output, None if nothing is cached or the source changed since it was stored
+
+    """
+    if not os.path.exists(cache_path):
+        return None
+
+    with open(cache_path, "r") as file:
+        cache = json.load(file)
+
+    if cache.get("source_hash") != hashlib.sha256(source.encode()).hexdigest():
+        return None
+
+    return cache["output"]
+
+
+def can_compile_offline(source_path="chaincode.sol", cache_path="compiled_code.json") -> bool:
+    """
+    Checks if the chain code is available without downloading the compiler
+    Args:
+        source_path: Path of the solidity file
+        cache_path: Path of the cached compiler output
+
+    Returns: True if the compiler output is cached or the compiler is installed
+
+    """
+    with open(source_path, "r") as file:
+        source = file.read()
+
+    return load_compiler_cache(source, cache_path) is not None or \
+        SOLC_VERSION in map(str, get_installed_solc_versions())
+
+
+def compile_chaincode(source_path="chaincode.sol", cache_path="compiled_code.json") -> Tuple[list, str]:
+    """
+    Compiles raw chaincode, the compiler output is cached together with the hash of the source
+    Args:
+        source_path: Path of the solidity file
+        cache_path: Path of the cached compiler output
+
+    Returns: ABI and bytecode of the ChainCode contract
+
+    """
+
+    # open raw solidity file
+    with open(source_path, "r") as file:
+        simple_storage_file = file.read()
+
+    source_hash = hashlib.sha256(simple_storage_file.encode()).hexdigest()
+
+    # reuse compiled code if the source did not change since it was stored
+    compiled_sol = load_compiler_cache(simple_storage_file, cache_path)
+
+    if compiled_sol is None:
+        # set compiler version, downloaded unless installed
+        try:
+            install_solc(SOLC_VERSION)
+        except (requests.exceptions.RequestException, ConnectionError) as e:
+            raise RuntimeError(f"solc {SOLC_VERSION} is not installed and could not be downloaded, install it with "
+                               f"'python -m solcx.install v{SOLC_VERSION}' or provide the compiler output of "
+                               f"{source_path} at {cache_path}") from e
+
+        # compile solidity code
+        compiled_sol = compile_standard(
+            {
+                "language": "Solidity",
+                "sources": {"chaincode.sol": {"content": simple_storage_file}},
+                "settings": {
+                    "evmVersion": 'paris',
+                    "outputSelection": {
+                        "*": {
+                            "*": ["abi", "metadata", "evm.bytecode", "evm.sourceMap"]
+                        }
+                    },
+                    "optimizer": {
+                        "enabled": True,
+                        "runs": 200
+                    }
+                },
+            },
+            solc_version=SOLC_VERSION,
+        )
+
+        # store compiled code as json
+        with open(cache_path, "w") as file:
+            json.dump({"source_hash": source_hash, "output": compiled_sol}, file)
+
+    # retrieve bytecode from the compiled contract
+    contract_bytecode = compiled_sol["contracts"]["chaincode.sol"]["ChainCode"]["evm"]["bytecode"]["object"]
+
+    # retrieve ABI from compiled contract
+    contract_abi = json.loads(compiled_sol["contracts"]["chaincode.sol"]["ChainCode"]["metadata"])["output"]["abi"]
+
+    return contract_abi, contract_bytecode
+
+
 class Oracle:
 
-    def __init__(self):
+    def __init__(self, provider=None, private_key=None, source_path="chaincode.sol",
+                 cache_path="compiled_code.json", contract_file=None, account_pool=None, lease_file=None,
+                 lease_ttl=None):
+        """
+        Creates instance of Oracle, deploying the chain code to the blockchain network.
+        Args:
+            provider: Optional web3 provider used instead of the non-validator nodes, e.g. of a SimulatedChain
+            private_key: Private key of the prefunded account as hex string, read from the envs if None
+            source_path: Path of the solidity file
+            cache_path: Path of the cached compiler output
+            contract_file: File persisting the contract address, read from the envs if None
+            account_pool: Private keys of accounts prefunded in the genesis, read from the file in the envs if None
+            lease_file: File persisting the leased accounts across recreation of the Oracle, read from the envs if None
+            lease_ttl: Seconds a lease lasts unless renewed by its client, read from the envs if None
+        """
+
+        # injected web3 provider, replaces the non-validator nodes
+        self.__provider = provider
+
+        # private key of the prefunded account, set during docker build unless injected
+        self.__private_key = private_key or os.environ.get("PRIVATE_KEY")
+
+        # paths of the raw chain code and its compiled output
+        self.__source_path = source_path
+        self.__cache_path = cache_path
+
         # header file, required for interacting with chain code
         self.__contract_abi = dict()
 
         # current (03.2024) average amount of WEI to pay for a unit of gas
         self.__gas_price_per_unit = float(27.3)
 
-        # static ip address of non-validator node (RPC)
-        self.__blockchain_address = "http://172.25.0.104:8545"
+        # file persisting the address of the deployed chain code across restarts, set during docker build
+        self.__contract_file = contract_file or os.environ.get("CONTRACT_FILE", "contract.json")
+
+        # ip addresses of all non-validator nodes (RPC), set during docker build
+        self.__blockchain_addresses = os.environ.get("RPC_URLS", "http://172.25.0.104:8545").split(",")
+
+        # accounts prefunded in the genesis, leased to clients instead of funding new accounts
+        self.__available_accounts = deque(account_pool if account_pool is not None else self.__load_account_pool())
+
+        # addresses of leased accounts mapped to their private keys and the expiry of their lease
+        self.__leased_accounts = dict()
+
+        # file persisting the leases next to the contract address, a recreated Oracle keeps them, set during docker build
+        self.__lease_file = lease_file or os.environ.get("LEASE_FILE", "leases.json")
+
+        # accounts of clients killed without releasing them return to the pool once their lease expired
+        self.__lease_ttl = float(lease_ttl if lease_ttl is not None else os.environ.get("LEASE_TTL", 3600))
+
+        # guards the account pool, requests are handled by multiple threads
+        self.__pool_lock = threading.Lock()
+
+        # take the accounts still leased by running clients out of the pool
+        self.__load_leases()
 
         # executes RPC request to non-validator node until ready
         self.__ready = self.wait_for_blockchain()
@@ -49,11 +207,15 @@ class Oracle:
         # create Web3 object for making transactions
         self.__web3 = self.__initialize_web3()
 
+        # awaits each transaction for the duration of a faucet request, resubmitting it while stuck in the txpool
+        self.__tracker = TransactionTracker(self.__web3, self.acc.key, timeout=20)
+
         # create a Web3 contract object from the compiled chaincode
         self.contract_obj = self.__compile_chaincode()
 
-        # deploy the contract to the blockchain network
-        self.__contract_address = self.deploy_chaincode()
+        # reuse the contract of a warm restarted network, deploy it to the blockchain network otherwise
+        self.__contract_address = self.__load_contract_address() or self.deploy_chaincode()
+        self.__store_contract_address()
 
         # update the contract object with the address
         self.contract_obj = self.__web3.eth.contract(
@@ -74,10 +236,17 @@ class Oracle:
     def wait_for_blockchain(self) -> bool:
         """
         Executes REST post request for a selected RPC method to check if blockchain
-        is up and running
+        is up and running on at least one non-validator node
         Returns: None
 
         """
+
+        # injected provider is checked directly
+        if self.__provider is not None:
+            if not self.__provider.is_connected():
+                raise Exception("Injected provider is not connected")
+            return True
+
         headers = {
             'Content-type': 'application/json',
             'Accept': 'application/json'
@@ -90,18 +259,25 @@ class Oracle:
             'params': []
         }
 
-        request = requests.post(
-            url=self.__blockchain_address,
-            json=data,
-            headers=headers
-        )
+        for address in self.__blockchain_addresses:
+            try:
+                request = requests.post(
+                    url=address,
+                    json=data,
+                    headers=headers
+                )
 
-        # raise Exception if status is an error one
-        request.raise_for_status()
+                # raise Exception if status is an error one
+                request.raise_for_status()
+            except (requests.exceptions.RequestException, ConnectionError) as e:
+                error = e
+                continue
 
-        print(f"ORACLE: RPC node up and running")
+            print(f"ORACLE: RPC node {address} up and running")
+            return True
 
-        return True
+        # raise last Exception if none of the nodes is ready
+        raise error
 
     def __initialize_web3(self):
         """
@@ -110,8 +286,8 @@ class Oracle:
 
         """
 
-        # initialize Web3 object with ip of non-validator node
-        web3 = Web3(Web3.HTTPProvider(self.__blockchain_address, request_kwargs={'timeout': 20}))  # 10
+        # initialize Web3 object balancing across all non-validator nodes
+        web3 = Web3(self.__provider or BalancedHTTPProvider(self.__blockchain_addresses, request_kwargs={'timeout': 20}))
 
         # inject Proof-of-Authority settings to object
         web3.middleware_onion.inject(geth_poa_middleware, layer=0)
@@ -133,65 +309,23 @@ class Oracle:
 
         """
 
-        # open raw solidity file
-        with open("chaincode.sol", "r") as file:
-            simple_storage_file = file.read()
-
-        # set compiler version
-        install_solc("0.8.22")
-
-        # compile solidity code
-        compiled_sol = compile_standard(
-            {
-                "language": "Solidity",
-                "sources": {"chaincode.sol": {"content": simple_storage_file}},
-                "settings": {
-                    "evmVersion": 'paris',
-                    "outputSelection": {
-                        "*": {
-                            "*": ["abi", "metadata", "evm.bytecode", "evm.sourceMap"]
-                        }
-                    },
-                    "optimizer": {
-                        "enabled": True,
-                        "runs": 200
-                    }
-                },
-            },
-            solc_version="0.8.22",
-        )
-
-        # store compiled code as json
-        with open("compiled_code.json", "w") as file:
-            json.dump(compiled_sol, file)
-
-        # retrieve bytecode from the compiled contract
-        contract_bytecode = compiled_sol["contracts"]["chaincode.sol"]["ChainCode"]["evm"]["bytecode"][
-            "object"]
-
-        # retrieve ABI from compiled contract
-        self.__contract_abi = \
-            json.loads(compiled_sol["contracts"]["chaincode.sol"]["ChainCode"]["metadata"])["output"][
-                "abi"]
+        # compile solidity code, reusing the output of a previous run if the source did not change
+        self.__contract_abi, contract_bytecode = compile_chaincode(self.__source_path, self.__cache_path)
 
         print(f"ORACLE: Solidity files compiled and bytecode ready")
 
         # return draft Web3 contract object
         return self.__web3.eth.contract(abi=self.__contract_abi, bytecode=contract_bytecode)
 
-    @staticmethod
-    def __create_account():
+    def __create_account(self):
         """
-        Retrieves the private key from the envs, set during docker build
+        Creates account from the private key, retrieved from the envs unless injected
         Returns: Web3 account object
 
         """
 
-        # retrieve private key, set during ducker build
-        private_key = os.environ.get("PRIVATE_KEY")
-
         # return Web3 account object
-        return Account.from_key("0x" + private_key)
+        return Account.from_key("0x" + self.__private_key)
 
     @retry((Exception, requests.exceptions.HTTPError), tries=3, delay=4)
     def transfer_funds(self, address):
@@ -231,16 +365,14 @@ class Oracle:
 
         """
 
-        # transaction is signed with private key
-        signed_transaction = self.__web3.eth.account.sign_transaction(trx_hash, private_key=self.acc.key)
-
-        # confirmation that transaction was passed from non-validator node to validator nodes
-        executed_transaction = self.__web3.eth.send_raw_transaction(signed_transaction.rawTransaction)
+        # transaction is signed, sent and resubmitted with a bumped gas price until validated by the validator nodes
+        outcome = self.__tracker.send(trx_hash)
 
-        # non-validator node awaited the successful validation by validation nodes and returns receipt
-        transaction_receipt = self.__web3.eth.wait_for_transaction_receipt(executed_transaction, timeout=20)  #5
+        # nonce was consumed by another transaction, the retry builds the transaction with a fresh nonce
+        if outcome.status == "dropped":
+            raise Exception(f"Transaction with nonce {trx_hash['nonce']} was dropped")
 
-        return transaction_receipt
+        return outcome.receipt
 
     @retry(Exception, tries=20, delay=5)
     def deploy_chaincode(self):
@@ -250,13 +382,20 @@ class Oracle:
 
         """
 
+        constructor = self.contract_obj.constructor()
+        value = self.__web3.to_wei("1", "ether")
+
+        # estimate the deployment with a safety margin, capped by the block gas limit of the profile
+        estimated_gas = constructor.estimate_gas({"from": self.acc.address, "value": value})
+        block_gas_limit = self.__web3.eth.get_block("latest")["gasLimit"]
+
         # create raw transaction with all properties to deploy contract
-        raw_transaction = self.contract_obj.constructor().build_transaction({
+        raw_transaction = constructor.build_transaction({
             "chainId": self.__web3.eth.chain_id,
             "from": self.acc.address,
-            "value": self.__web3.to_wei("1", "ether"),
+            "value": value,
             "gasPrice": self.__web3.to_wei(self.__gas_price_per_unit, "gwei"),
-            "gas":self.__web3.to_wei(20, "gwei"),
+            "gas": min(int(estimated_gas * 1.2), block_gas_limit),
             "nonce": self.__web3.eth.get_transaction_count(self.acc.address, 'pending')
         })
 
@@ -271,6 +410,150 @@ class Oracle:
         # returns contract address for clients to call the chain code directly
         return contract_address
 
+    def __load_contract_address(self):
+        """
+        Loads the address of a chain code deployed before the restart, if its code is still on the ledger
+        Returns: address of chain code or None if it needs to be deployed
+
+        """
+        if not os.path.exists(self.__contract_file):
+            return None
+
+        with open(self.__contract_file, "r") as file:
+            contract_address = json.load(file).get("address")
+
+        # chain data might have been reset since the address was stored
+        if not contract_address or not self.__web3.eth.get_code(contract_address):
+            return None
+
+        print(f"BLOCKCHAIN: Chain code reused at {contract_address}")
+        return contract_address
+
+    def __store_contract_address(self) -> None:
+        """
+        Stores the address of the deployed chain code for warm restarts
+        Returns: None
+
+        """
+        with open(self.__contract_file, "w") as file:
+            json.dump({"address": self.__contract_address}, file)
+
+    @staticmethod
+    def __load_account_pool() -> list:
+        """
+        Retrieves the private keys of the prefunded accounts from the file mounted during deployment
+        Returns: List of private keys as hex strings
+
+        """
+        path = os.environ.get("ACCOUNT_POOL")
+
+        if not path or not os.path.exists(path):
+            return list()
+
+        with open(path, "r") as file:
+            return json.load(file)
+
+    def __load_leases(self) -> None:
+        """
+        Restores the unexpired leases stored by a previous Oracle of the deployment
+        Returns: None
+
+        """
+        if not os.path.exists(self.__lease_file):
+            return
+
+        with open(self.__lease_file, "r") as file:
+            expiries = json.load(file)
+
+        for private_key in list(self.__available_accounts):
+            address = Account.from_key("0x" + private_key).address
+            if address in expiries:
+                self.__available_accounts.remove(private_key)
+                self.__leased_accounts[address] = (private_key, expiries[address])
+
+        self.__reclaim_expired_leases()
+
+    def __store_leases(self) -> None:
+        """
+        Stores the expiry of all leases, must be called holding the lock
+        Returns: None
+
+        """
+        # replaced atomically, a crash while writing never loses all leases
+        with open(f"{self.__lease_file}.tmp", "w") as file:
+            json.dump({address: expiry for address, (_, expiry) in self.__leased_accounts.items()}, file)
+        os.replace(f"{self.__lease_file}.tmp", self.__lease_file)
+
+    def __reclaim_expired_leases(self) -> None:
+        """
+        Returns the accounts of expired leases to the pool, must be called holding the lock
+        Returns: None
+
+        """
+        now = time.time()
+        for address, (private_key, expiry) in list(self.__leased_accounts.items()):
+            if expiry <= now:
+                del self.__leased_accounts[address]
+                self.__available_accounts.append(private_key)
+                print(f"ORACLE: Lease of {address} expired")
+
+    def lease_account(self):
+        """
+        Leases a prefunded account exclusively to a client, replacing a new account and a faucet transaction
+        Returns: Dict with private key, address and seconds until the lease expires unless renewed, None if the pool
+            is exhausted
+
+        """
+        with self.__pool_lock:
+            self.__reclaim_expired_leases()
+            if not self.__available_accounts:
+                return None
+
+            private_key = self.__available_accounts.popleft()
+            address = Account.from_key("0x" + private_key).address
+            self.__leased_accounts[address] = (private_key, time.time() + self.__lease_ttl)
+            self.__store_leases()
+
+        return {"private_key": private_key, "address": address, "ttl": self.__lease_ttl}
+
+    def renew_account(self, address) -> bool:
+        """
+        Extends the lease of an account by the lease duration
+        Args:
+            address: public wallet address of the leased account
+
+        Returns: True if the account is still leased, False if its lease expired or it was never leased
+
+        """
+        with self.__pool_lock:
+            self.__reclaim_expired_leases()
+            address = self.__web3.to_checksum_address(address)
+            if address not in self.__leased_accounts:
+                return False
+
+            private_key, _ = self.__leased_accounts[address]
+            self.__leased_accounts[address] = (private_key, time.time() + self.__lease_ttl)
+            self.__store_leases()
+            return True
+
+    def release_account(self, address) -> bool:
+        """
+        Returns a leased account to the pool
+        Args:
+            address: public wallet address of the leased account
+
+        Returns: True if the account was leased, False otherwise
+
+        """
+        with self.__pool_lock:
+            lease = self.__leased_accounts.pop(self.__web3.to_checksum_address(address), None)
+            if lease is None:
+                return False
+
+            self.__available_accounts.append(lease[0])
+            self.__store_leases()
+            return True
+
     def get_balance(self, addr):
         """
         Creates transaction to blockchain network to request balance for parameter address
@@ -326,6 +609,45 @@ def transfer_funds():
     })
 
 
+@app.route("/lease", methods=["POST"])
+@error_handler
+def lease_account():
+    """
+    Leases a prefunded account to the requesting client.
+    """
+    account = oracle.lease_account()
+    if account is None:
+        return jsonify({"error": "Account pool is exhausted"}), 404
+
+    return jsonify(account)
+
+
+@app.route("/release", methods=["POST"])
+@error_handler
+def release_account():
+    """
+    Returns a leased account to the pool.
+    """
+    address = request.get_json().get("address")
+    if not oracle.release_account(address):
+        raise Exception(f"Account {address} is not leased")
+
+    return jsonify({"Message": f"Released {address}"})
+
+
+@app.route("/renew", methods=["POST"])
+@error_handler
+def renew_account():
+    """
+    Extends the lease of an account, its client keeps it as long as it renews in time.
+    """
+    address = request.get_json().get("address")
+    if not oracle.renew_account(address):
+        raise Exception(f"Account {address} is not leased")
+
+    return jsonify({"Message": f"Renewed {address}"})
+
+
 @app.route("/balance", methods=["GET"])
 @error_handler
 def balance():
@@ -0,0 +1,107 @@
+from typing import NamedTuple
+
+
+class Profile(NamedTuple):
+    """
+        Tuning settings applied consistently to the genesis and the command line of every geth node
+    """
+
+    # block time in seconds (clique period)
+    period: int
+
+    # gas limit of the genesis block
+    gas_limit: int
+
+    # gas limit the validators converge to when sealing blocks
+    gas_target: int
+
+    # executable and non-executable transaction slots of the txpool, in total and per account
+    txpool_global_slots: int
+    txpool_global_queue: int
+    txpool_account_slots: int
+    txpool_account_queue: int
+
+    # memory in MB allocated to geth's internal caching
+    cache: int
+
+    # maximum number of requests and response size in bytes of a RPC batch
+    rpc_batch_limit: int
+    rpc_batch_response_size: int
+
+    # gas cap of eth_call and eth_estimateGas, 0 for no cap
+    rpc_gas_cap: int
+
+    def __node_flags(self) -> str:
+        """
+        Returns: Flags shared by all geth nodes
+        """
+        return (f"--txpool.globalslots={self.txpool_global_slots} "
+                f"--txpool.globalqueue={self.txpool_global_queue} "
+                f"--txpool.accountslots={self.txpool_account_slots} "
+                f"--txpool.accountqueue={self.txpool_account_queue} "
+                f"--cache={self.cache}")
+
+    @property
+    def validator_flags(self) -> str:
+        """
+        Returns: Flags of validator nodes, sealing blocks
+        """
+        return f"{self.__node_flags()} --miner.gaslimit={self.gas_target}"
+
+    @property
+    def rpc_flags(self) -> str:
+        """
+        Returns: Flags of non-validator nodes, serving the RPC-API
+        """
+        return (f"{self.__node_flags()} "
+                f"--rpc.batch-request-limit={self.rpc_batch_limit} "
+                f"--rpc.batch-response-max-size={self.rpc_batch_response_size} "
+                f"--rpc.gascap={self.rpc_gas_cap}")
+
+
+PROFILES = {
+    # previous static settings, geth's defaults for all node flags
+    "default": Profile(
+        period=1,
+        gas_limit=9000000000000,
+        gas_target=30000000,
+        txpool_global_slots=5120,
+        txpool_global_queue=1024,
+        txpool_account_slots=16,
+        txpool_account_queue=64,
+        cache=1024,
+        rpc_batch_limit=1000,
+        rpc_batch_response_size=25000000,
+        rpc_gas_cap=50000000
+    ),
+
+    # small blocks propagate and verify fast, short queues keep pending transactions close to the head
+    "latency": Profile(
+        period=1,
+        gas_limit=30000000,
+        gas_target=30000000,
+        txpool_global_slots=2048,
+        txpool_global_queue=512,
+        txpool_account_slots=16,
+        txpool_account_queue=32,
+        cache=1024,
+        rpc_batch_limit=100,
+        rpc_batch_response_size=5000000,
+        rpc_gas_cap=50000000
+    ),
+
+    # fewer but fuller blocks amortize sealing per transaction, large pools absorb bursts of many clients
+    "throughput": Profile(
+        period=2,
+        gas_limit=9000000000000,
+        gas_target=9000000000000,
+        txpool_global_slots=65536,
+        txpool_global_queue=16384,
+        txpool_account_slots=1024,
+        txpool_account_queue=1024,
+        cache=4096,
+        rpc_batch_limit=10000,
+        rpc_batch_response_size=250000000,
+        rpc_gas_cap=0
+    ),
+}
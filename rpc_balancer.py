@@ -0,0 +1,189 @@
+import threading
+import time
+from typing import Any, List
+
+import requests
+from web3 import HTTPProvider
+from web3.providers import JSONBaseProvider
+from web3.types import RPCEndpoint, RPCResponse
+
+# methods depending on the txpool of a single node, routed to one node to keep nonces consistent
+STICKY_METHODS = {"eth_sendRawTransaction", "eth_sendTransaction", "eth_getTransactionCount"}
+
+# HTTP status codes of a node which is overloaded or broken, counted as failure like a missing response
+FAILURE_STATUS_CODES = {429, 500, 502, 503, 504}
+
+
+class Endpoint:
+    """
+        Single RPC node with the statistics used for selecting it
+    """
+
+    def __init__(self, uri, request_kwargs=None):
+        self.uri = uri
+        self.provider = HTTPProvider(uri, request_kwargs=request_kwargs)
+
+        # number of requests currently in flight
+        self.outstanding = 0
+
+        # exponentially weighted moving average of the response time in seconds, 0 until first measured
+        self.latency = 0.0
+
+        # consecutive failed requests, resets after first successful request
+        self.failures = 0
+
+        # point in time until the node is excluded from selection
+        self.ejected_until = 0.0
+
+    def healthy(self, now) -> bool:
+        return self.ejected_until <= now
+
+
+class BalancedHTTPProvider(JSONBaseProvider):
+    """
+        Web3 provider balancing requests across multiple RPC nodes, ejecting nodes which stopped responding
+    """
+
+    # weight of the latest measured response time in the moving average
+    __alpha = 0.3
+
+    def __init__(self, endpoint_uris: List[str], strategy="least_outstanding", request_kwargs=None,
+                 max_failures=3, ejection_period=10):
+        """
+        Creates instance of BalancedHTTPProvider
+        Args:
+            endpoint_uris: URLs of all RPC nodes
+            strategy: Either 'least_outstanding' or 'least_latency'
+            request_kwargs: Keyword arguments passed to each request, e.g. timeout
+            max_failures: Number of consecutive failed requests after which a node is ejected
+            ejection_period: Seconds an ejected node is excluded before being probed again
+        """
+        super().__init__()
+
+        if not endpoint_uris:
+            raise ValueError("At least one RPC endpoint is required")
+
+        if strategy not in ("least_outstanding", "least_latency"):
+            raise ValueError(f"Unknown balancing strategy '{strategy}'")
+
+        self.__endpoints = [Endpoint(uri, request_kwargs) for uri in endpoint_uris]
+        self.__strategy = strategy
+        self.__max_failures = max_failures
+        self.__ejection_period = ejection_period
+
+        # guards the statistics of all endpoints, requests may be issued from multiple threads
+        self.__lock = threading.Lock()
+
+    @property
+    def endpoints(self) -> List[Endpoint]:
+        return self.__endpoints
+
+    def __select(self, method, excluded) -> Endpoint:
+        """
+        Selects the endpoint for the next request and marks it as in flight
+        Args:
+            method: RPC method of the request
+            excluded: Endpoints which already failed for this request
+
+        Returns: Selected endpoint
+
+        """
+        now = time.monotonic()
+
+        with self.__lock:
+            candidates = [e for e in self.__endpoints if e not in excluded] or self.__endpoints
+            healthy = [e for e in candidates if e.healthy(now)]
+
+            if not healthy:
+                # fail open and probe the node which was ejected first
+                endpoint = min(candidates, key=lambda e: e.ejected_until)
+            elif method in STICKY_METHODS:
+                endpoint = healthy[0]
+            elif self.__strategy == "least_latency":
+                endpoint = min(healthy, key=lambda e: (e.latency, e.outstanding))
+            else:
+                endpoint = min(healthy, key=lambda e: (e.outstanding, e.latency))
+
+            endpoint.outstanding += 1
+            return endpoint
+
+    def __release(self, endpoint) -> None:
+        """
+        Marks a request of an endpoint as no longer in flight, no matter how it finished
+        Args:
+            endpoint: Endpoint the request was sent to
+
+        Returns: None
+
+        """
+        with self.__lock:
+            endpoint.outstanding -= 1
+
+    def __record(self, endpoint, elapsed, failed) -> None:
+        """
+        Updates the statistics of an endpoint after a request finished
+        Args:
+            endpoint: Endpoint the request was sent to
+            elapsed: Response time in seconds
+            failed: True if the node did not respond or responded with a failure status
+
+        Returns: None
+
+        """
+        with self.__lock:
+            if failed:
+                endpoint.failures += 1
+                if endpoint.failures >= self.__max_failures:
+                    endpoint.ejected_until = time.monotonic() + self.__ejection_period
+                return
+
+            endpoint.failures = 0
+            endpoint.ejected_until = 0.0
+            endpoint.latency = elapsed if not endpoint.latency else \
+                self.__alpha * elapsed + (1 - self.__alpha) * endpoint.latency
+
+    def make_request(self, method: RPCEndpoint, params: Any) -> RPCResponse:
+        """
+        Sends the request to the selected node, failing over to the remaining nodes if it does not respond or
+        responds with a failure status
+        Args:
+            method: RPC method
+            params: Parameters of the RPC method
+
+        Returns: RPC response of the first responding node
+
+        """
+        failed = list()
+
+        while True:
+            endpoint = self.__select(method, failed)
+            start = time.monotonic()
+
+            try:
+                response = endpoint.provider.make_request(method, params)
+            except (requests.exceptions.ConnectionError, requests.exceptions.Timeout) as e:
+                error = e
+            except requests.exceptions.HTTPError as e:
+                # errors of the request itself are not the node's fault and are not retried on other nodes
+                if e.response is None or e.response.status_code not in FAILURE_STATUS_CODES:
+                    raise
+                error = e
+            else:
+                self.__record(endpoint, time.monotonic() - start, failed=False)
+                return response
+            finally:
+                # any other exception, e.g. an invalid JSON response, must not leave the request in flight
+                self.__release(endpoint)
+
+            self.__record(endpoint, time.monotonic() - start, failed=True)
+            failed.append(endpoint)
+
+            # raise if all nodes were tried without success
+            if len(failed) >= len(self.__endpoints):
+                raise error
+
+    def is_connected(self, show_traceback: bool = False) -> bool:
+        """
+        Returns: True if at least one node is responding
+        """
+        return any(e.provider.is_connected(show_traceback) for e in self.__endpoints)
@@ -0,0 +1,354 @@
+import json
+import os
+import threading
+import time
+from collections import Counter, OrderedDict
+from concurrent.futures import Future
+from typing import Any, Tuple
+
+from flask import Flask, jsonify, request
+
+from rpc_balancer import BalancedHTTPProvider
+
+app = Flask(__name__)
+
+# results never change once they exist, e.g. of a sealed block or of a mined transaction
+IMMUTABLE_METHODS = {
+    "eth_chainId", "net_version", "web3_clientVersion", "eth_getBlockByHash", "eth_getTransactionByHash",
+    "eth_getTransactionReceipt", "eth_getBlockTransactionCountByHash"
+}
+
+# results of a transaction, immutable only once it was mined
+TRANSACTION_METHODS = {"eth_getTransactionByHash", "eth_getTransactionReceipt"}
+
+# results only change with a new block, position of the block parameter in params
+BLOCK_METHODS = {
+    "eth_getBalance": 1,
+    "eth_getCode": 1,
+    "eth_getTransactionCount": 1,
+    "eth_getStorageAt": 2,
+    "eth_call": 1,
+    "eth_estimateGas": 1,
+    "eth_getBlockByNumber": 0,
+    "eth_getBlockTransactionCountByNumber": 0,
+    "eth_gasPrice": None,
+    "eth_maxPriorityFeePerGas": None
+}
+
+# JSON-RPC error code of an upstream which did not respond
+UPSTREAM_ERROR = -32603
+
+
+def classify(method, params) -> str | None:
+    """
+    Decides how long the result of a request may be cached
+    Args:
+        method: RPC method
+        params: Parameters of the RPC method
+
+    Returns: 'immutable', 'block' for the current head only, or None if the request is passed through
+
+    """
+    if method in IMMUTABLE_METHODS:
+        return "immutable"
+
+    if method not in BLOCK_METHODS:
+        return None
+
+    position = BLOCK_METHODS[method]
+    block = params[position] if position is not None and len(params) > position else "latest"
+
+    # a block given by hash (EIP-1898) or the genesis never changes
+    if isinstance(block, dict) and "blockHash" in block:
+        return "immutable"
+    if block == "earliest":
+        return "immutable"
+
+    # pending state changes with every transaction entering the txpool, e.g. the nonce of the next transaction
+    if block == "pending":
+        return None
+
+    # latest, safe, finalized and block numbers, clique's short reorgs may still change recent block numbers
+    return "block"
+
+
+def is_final(method, result) -> bool:
+    """
+    Decides if the result of an immutable method can be cached forever
+    Args:
+        method: RPC method
+        result: Result of the RPC method
+
+    Returns: False for unknown blocks and transactions, which may still appear, and for pending transactions, which
+        may still be mined, replaced or dropped
+
+    """
+    if result is None:
+        return False
+
+    if method in TRANSACTION_METHODS:
+        return bool(result.get("blockNumber"))
+
+    return True
+
+
+class RpcProxy:
+    """
+        Caching JSON-RPC proxy in front of the non-validator nodes, shared by all clients and the Oracle
+    """
+
+    def __init__(self, provider=None, rpc_urls=None, head_ttl=0.25, max_entries=100000):
+        """
+        Creates instance of RpcProxy
+        Args:
+            provider: Optional web3 provider of the upstream, e.g. a stub, instead of balancing across rpc_urls
+            rpc_urls: URLs of the non-validator nodes, defaults to the RPC_URLS environment variable
+            head_ttl: Seconds the block number of the head is reused before asking the upstream again, bounds how
+                long results of the previous block are served after a new block was sealed
+            max_entries: Maximum number of cached immutable results, least recently used are evicted first
+        """
+        if provider is None:
+            rpc_urls = rpc_urls or os.environ.get("RPC_URLS", "http://localhost:8545").split(",")
+            provider = BalancedHTTPProvider(rpc_urls)
+
+        self.__provider = provider
+        self.__head_ttl = head_ttl
+        self.__max_entries = max_entries
+
+        # results valid forever, in order of their last use
+        self.__immutable = OrderedDict()
+
+        # results valid as long as the head did not change
+        self.__per_block = dict()
+
+        # block number of the head, None until first requested
+        self.__head = None
+        self.__head_checked = 0.0
+
+        # identical requests currently sent to the upstream, later callers wait for the first one
+        self.__in_flight = dict()
+
+        # hits, misses, coalesced and passed through requests, in total and per method
+        self.__metrics = Counter()
+        self.__method_metrics = dict()
+
+        # guards caches, in-flight requests and metrics, requests are served from multiple threads
+        self.__lock = threading.Lock()
+
+    def __count(self, method, outcome) -> None:
+        """
+        Counts the outcome of a request, must be called holding the lock
+        Args:
+            method: RPC method
+            outcome: One of 'hits', 'misses', 'coalesced', 'passthrough', 'errors'
+
+        Returns: None
+
+        """
+        self.__metrics[outcome] += 1
+        self.__method_metrics.setdefault(method, Counter())[outcome] += 1
+
+    def __upstream(self, method, params) -> dict:
+        """
+        Sends a request to the upstream, an upstream without response is reported as JSON-RPC error
+        Args:
+            method: RPC method
+            params: Parameters of the RPC method
+
+        Returns: JSON-RPC response
+
+        """
+        try:
+            return dict(self.__provider.make_request(method, params))
+        except Exception as e:
+            with self.__lock:
+                self.__count(method, "errors")
+            return {"jsonrpc": "2.0", "error": {"code": UPSTREAM_ERROR, "message": f"Upstream failed: {e}"}}
+
+    def __coalesced(self, key, method, params) -> Tuple[dict, bool]:
+        """
+        Sends a request to the upstream once, no matter how many callers request it at the same time
+        Args:
+            key: Identity of the request
+            method: RPC method
+            params: Parameters of the RPC method
+
+        Returns: JSON-RPC response and True if this caller sent the request itself
+
+        """
+        with self.__lock:
+            future = self.__in_flight.get(key)
+            leader = future is None
+            if leader:
+                future = self.__in_flight[key] = Future()
+            else:
+                self.__count(method, "coalesced")
+
+        if not leader:
+            return future.result(), False
+
+        try:
+            response = self.__upstream(method, params)
+            future.set_result(response)
+        finally:
+            with self.__lock:
+                del self.__in_flight[key]
+
+        return response, True
+
+    def __refresh_head(self) -> int | None:
+        """
+        Asks the upstream for the head once the cached one expired, dropping all results of the previous head
+        Returns: Block number of the head, None if the upstream did not respond
+
+        """
+        if time.monotonic() - self.__head_checked > self.__head_ttl:
+            response, _ = self.__coalesced("eth_blockNumber", "eth_blockNumber", [])
+            if "result" in response:
+                self.__advance_head(int(response["result"], 16))
+
+        return self.__head
+
+    def __advance_head(self, number) -> None:
+        """
+        Moves the head forward, results of the previous head are dropped
+        Args:
+            number: Block number of the head seen by the upstream
+
+        Returns: None
+
+        """
+        with self.__lock:
+            self.__head_checked = time.monotonic()
+            if self.__head is None or number > self.__head:
+                self.__head = number
+                self.__per_block.clear()
+
+    def __store(self, cache, key, response) -> None:
+        """
+        Caches a successful response, must be called holding the lock
+        Args:
+            cache: Either 'immutable' or 'block'
+            key: Identity of the request
+            response: JSON-RPC response
+
+        Returns: None
+
+        """
+        if cache == "block":
+            self.__per_block[key] = response
+            return
+
+        self.__immutable[key] = response
+        if len(self.__immutable) > self.__max_entries:
+            self.__immutable.popitem(last=False)
+
+    def call(self, method, params) -> dict:
+        """
+        Serves a single request from cache or upstream, writes and pending state are passed through unchanged
+        Args:
+            method: RPC method
+            params: Parameters of the RPC method
+
+        Returns: JSON-RPC response without id
+
+        """
+        params = params or []
+
+        # the head is tracked by the proxy itself, all callers share one request per head_ttl
+        if method == "eth_blockNumber":
+            head = self.__refresh_head()
+            if head is not None:
+                with self.__lock:
+                    self.__count(method, "hits")
+                return {"jsonrpc": "2.0", "result": hex(head)}
+
+        cache = classify(method, params)
+
+        if cache is None:
+            with self.__lock:
+                self.__count(method, "passthrough")
+            return self.__upstream(method, params)
+
+        key = json.dumps([method, params], sort_keys=True, separators=(",", ":"))
+
+        # results of the head are keyed by its number, a response of the previous head never ends up in the cache
+        if cache == "block":
+            key = f"{self.__refresh_head()}:{key}"
+
+        with self.__lock:
+            response = self.__per_block.get(key) if cache == "block" else self.__immutable.get(key)
+            if response is not None:
+                if cache == "immutable":
+                    self.__immutable.move_to_end(key)
+                self.__count(method, "hits")
+                return response
+
+        response, leader = self.__coalesced(key, method, params)
+        if not leader or "result" not in response:
+            return response
+
+        result = response["result"]
+
+        # a mined transaction reveals a new head before the cached one expired
+        if method == "eth_getTransactionReceipt" and result and result.get("blockNumber"):
+            self.__advance_head(int(result["blockNumber"], 16))
+
+        with self.__lock:
+            self.__count(method, "misses")
+
+            if cache == "block" or is_final(method, result):
+                self.__store(cache, key, response)
+
+        return response
+
+    def handle(self, payload: Any) -> Any:
+        """
+        Serves a JSON-RPC request or batch of requests, each keeping the id of the caller
+        Args:
+            payload: Decoded JSON body of the HTTP request
+
+        Returns: JSON-RPC response or list of responses
+
+        """
+        if isinstance(payload, list):
+            return [self.handle(single) for single in payload]
+
+        response = self.call(payload.get("method"), payload.get("params"))
+        return {**response, "id": payload.get("id")}
+
+    @property
+    def metrics(self) -> dict:
+        """
+        Returns: Counters of hits, misses, coalesced and passed through requests, in total and per method
+        """
+        with self.__lock:
+            lookups = self.__metrics["hits"] + self.__metrics["misses"] + self.__metrics["coalesced"]
+            return {
+                **{key: self.__metrics[key] for key in ("hits", "misses", "coalesced", "passthrough", "errors")},
+                "hit_ratio": (self.__metrics["hits"] + self.__metrics["coalesced"]) / lookups if lookups else 0.0,
+                "cached": len(self.__immutable) + len(self.__per_block),
+                "head": self.__head,
+                "methods": {method: dict(counter) for method, counter in self.__method_metrics.items()}
+            }
+
+
+@app.route("/", methods=["POST"])
+def rpc():
+    """
+    JSON-RPC endpoint, used like the endpoint of a non-validator node.
+    """
+    return jsonify(proxy.handle(request.get_json(force=True)))
+
+
+@app.route("/metrics", methods=["GET"])
+def metrics():
+    """
+    Responds with the hit/miss counters of the cache.
+    """
+    return jsonify(proxy.metrics)
+
+
+if __name__ == "__main__":
+    proxy = RpcProxy(head_ttl=float(os.environ.get("HEAD_TTL", 0.25)))
+    app.run(debug=False, host="0.0.0.0", port=8545, threaded=True)
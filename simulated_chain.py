@@ -0,0 +1,170 @@
+import os
+import tempfile
+
+from eth_tester import EthereumTester, PyEVMBackend
+from eth_utils import to_canonical_address
+from web3.providers.eth_tester import EthereumTesterProvider
+
+from key_material import generate_identities
+from oracle.app import Oracle
+from profiles import PROFILES
+
+# Dir storing chain code and other property files
+INPUT_DIR = os.path.dirname(os.path.abspath(__file__))
+
+# chain code and its committed compiler output, the chain runs offline without solc as long as both match
+SOURCE_PATH = os.path.join(INPUT_DIR, "chaincode", "chaincode.sol")
+CACHE_PATH = os.path.join(INPUT_DIR, "chaincode", "compiled_code.json")
+
+# funds of the Oracle in WEI, same as in the genesis of a deployed network
+ORACLE_BALANCE = 0x200000000000000000000000000000000000000000000000000000000000000
+
+
+class LocalOracle:
+    """
+        In-process stand-in for the Oracle's REST-API, calling an Oracle instance directly
+    """
+
+    def __init__(self, oracle: Oracle):
+        self.__oracle = oracle
+
+    def status(self) -> None:
+        """
+        Raises an Exception if the blockchain is not ready yet
+        Returns: None
+        """
+        if not self.__oracle.ready:
+            raise Exception("Blockchain is not responding yet")
+
+    def faucet(self, address) -> None:
+        """
+        Transfers funds to the address
+        Args:
+            address: public wallet address to fund
+
+        Returns: None
+
+        """
+        self.__oracle.transfer_funds(address)
+
+    def lease(self):
+        """
+        Leases an account prefunded in the genesis
+        Returns: Dict with private key and address, None if the pool is exhausted
+        """
+        return self.__oracle.lease_account()
+
+    def renew(self, address) -> None:
+        """
+        Extends the lease of an account
+        Args:
+            address: public wallet address of the leased account
+
+        Returns: None
+
+        """
+        if not self.__oracle.renew_account(address):
+            raise Exception(f"Account {address} is not leased")
+
+    def release(self, address) -> None:
+        """
+        Returns a leased account to the pool
+        Args:
+            address: public wallet address of the leased account
+
+        Returns: None
+
+        """
+        if not self.__oracle.release_account(address):
+            raise Exception(f"Account {address} is not leased")
+
+    def contract(self) -> dict:
+        """
+        Returns: Dict with abi and address of the deployed chain code
+        """
+        return {
+            "address": self.__oracle.contract_address,
+            "abi": self.__oracle.contract_abi
+        }
+
+
+class SimulatedChain:
+    """
+        In-process EVM with deployed ChainCode and Oracle, running without docker and network
+    """
+
+    def __init__(self, profile="default", n_accounts=10, seed=None):
+        """
+        Creates instance of SimulatedChain, deploying the chain code with an Oracle prefunded in the genesis
+        Args:
+            profile: Name of the tuning profile, whose gas limit is applied to the genesis
+            n_accounts: Number of client accounts prefunded in the genesis, leased to clients by the Oracle
+            seed: Optional seed for regenerating the same key material bit-for-bit
+        """
+
+        # genesis with the same gas limit as a deployed network, the Oracle's deployment exceeds the default limit
+        genesis_parameters = PyEVMBackend.generate_genesis_params(overrides={
+            "gas_limit": PROFILES[profile].gas_limit
+        })
+
+        # key material of the Oracle and the account pool
+        oracle_acc, *accounts = generate_identities(n_accounts + 1, seed=seed)
+
+        # prefund Oracle and account pool as done by the genesis of a deployed network, next to the tester accounts
+        genesis_state = PyEVMBackend.generate_genesis_state()
+        genesis_state[to_canonical_address(oracle_acc.address)] = self.__genesis_account(ORACLE_BALANCE)
+        for acc in accounts:
+            genesis_state[to_canonical_address(acc.address)] = self.__genesis_account(500 * 10 ** 18)
+
+        # in-process EVM mining every transaction instantly
+        self.__provider = EthereumTesterProvider(EthereumTester(PyEVMBackend(
+            genesis_parameters=genesis_parameters,
+            genesis_state=genesis_state
+        )))
+
+        # contract address only lives as long as the in-process chain
+        self.__tmp_dir = tempfile.TemporaryDirectory()
+
+        # committed compiler output is used as long as the source did not change, recompiling requires solc
+        self.__oracle = Oracle(
+            provider=self.__provider,
+            private_key=oracle_acc.private_key,
+            source_path=SOURCE_PATH,
+            cache_path=CACHE_PATH,
+            contract_file=os.path.join(self.__tmp_dir.name, "contract.json"),
+            lease_file=os.path.join(self.__tmp_dir.name, "leases.json"),
+            account_pool=[acc.private_key for acc in accounts]
+        )
+
+    @staticmethod
+    def __genesis_account(balance) -> dict:
+        """
+        Creates genesis state of an externally owned account
+        Args:
+            balance: Balance in WEI
+
+        Returns: Genesis state dict
+
+        """
+        return {"balance": balance, "nonce": 0, "code": b"", "storage": {}}
+
+    @property
+    def provider(self) -> EthereumTesterProvider:
+        """
+        Returns: Web3 provider of the in-process EVM, injected into Blockchain or Oracle
+        """
+        return self.__provider
+
+    @property
+    def oracle(self) -> LocalOracle:
+        """
+        Returns: Oracle interface injected into Blockchain instead of the REST-API
+        """
+        return LocalOracle(self.__oracle)
+
+
+if __name__ == "__main__":
+    from client import Blockchain
+
+    chain = SimulatedChain()
+    Blockchain(provider=chain.provider, oracle=chain.oracle)
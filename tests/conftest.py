@@ -0,0 +1,35 @@
+import os
+import sys
+
+import pytest
+
+# tests import the modules of the repository root
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT_DIR)
+
+# payable constructor returning a single zero byte of runtime code, stands in for the compiled chain code
+STUB_ABI = [{"type": "constructor", "stateMutability": "payable", "inputs": []}]
+STUB_BYTECODE = "0x60016000f3"
+
+
+@pytest.fixture
+def stub_compiler(monkeypatch):
+    """
+    Deploys the stub contract instead of compiling the chain code
+    """
+    import oracle.app
+
+    monkeypatch.setattr(oracle.app, "compile_chaincode", lambda *args, **kwargs: (STUB_ABI, STUB_BYTECODE))
+
+
+@pytest.fixture
+def chaincode():
+    """
+    Skips a test deploying the chain code if the committed compiler output does not match the source and solc is not
+    installed to recompile it
+    """
+    from oracle.app import can_compile_offline
+    from simulated_chain import CACHE_PATH, SOURCE_PATH
+
+    if not can_compile_offline(SOURCE_PATH, CACHE_PATH):
+        pytest.skip(f"solc is not installed and {CACHE_PATH} holds no output of the current source")
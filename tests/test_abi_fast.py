@@ -0,0 +1,52 @@
+import random
+
+import pytest
+from web3 import Web3
+
+from abi_fast import decode_bytes32_array, decode_string_array
+
+codec = Web3().codec
+
+# ascii, 2, 3 and 4 byte UTF-8 characters, strings cross the 32 byte padding in both directions
+ALPHABET = "ab \x00é€😀"
+
+
+def random_strings(rng, n) -> list:
+    return ["".join(rng.choice(ALPHABET) for _ in range(rng.randint(0, 70))) for _ in range(n)]
+
+
+@pytest.mark.parametrize("seed", range(20))
+def test_string_array_matches_codec(seed):
+    rng = random.Random(seed)
+    strings = random_strings(rng, rng.choice([0, 1, 2, rng.randint(3, 500)]))
+    data = codec.encode(["string[]"], [strings])
+    expected = list(codec.decode(["string[]"], data)[0])
+
+    assert decode_string_array(data) == expected == strings
+
+    lazy = decode_string_array(data, lazy=True)
+    assert len(lazy) == len(expected)
+    assert list(lazy) == expected and lazy == expected
+    if expected:
+        index = rng.randrange(len(expected))
+        assert lazy[index] == expected[index] and lazy[-1] == expected[-1]
+        assert lazy[index:] == expected[index:]
+
+
+@pytest.mark.parametrize("seed", range(20))
+def test_bytes32_array_matches_codec(seed):
+    rng = random.Random(seed)
+    refs = [rng.randbytes(32) for _ in range(rng.choice([0, 1, rng.randint(2, 500)]))]
+    data = codec.encode(["bytes32[]"], [refs])
+
+    assert decode_bytes32_array(data) == list(codec.decode(["bytes32[]"], data)[0]) == refs
+
+
+def test_truncated_data_raises():
+    data = codec.encode(["string[]"], [["a" * 40, "b"]])
+
+    for truncated in (b"", data[:50], data[:-40]):
+        with pytest.raises(ValueError):
+            decode_string_array(truncated)
+    with pytest.raises(ValueError):
+        decode_bytes32_array(codec.encode(["bytes32[]"], [[b"\x01" * 32] * 3])[:-1])
@@ -0,0 +1,74 @@
+import pytest
+
+from client import Blockchain
+from key_material import generate_identities
+from oracle.app import Oracle
+from simulated_chain import SimulatedChain
+
+
+def test_failed_run_releases_leased_account(stub_compiler):
+    chain = SimulatedChain(n_accounts=1, seed="test")
+
+    # the stub contract has none of the chain code's methods, the testing run fails after the lease
+    with pytest.raises(Exception):
+        Blockchain(provider=chain.provider, oracle=chain.oracle)
+
+    leased = chain.oracle.lease()
+    assert leased is not None
+    chain.oracle.release(leased["address"])
+
+
+def test_release_account_returns_lease_once(stub_compiler):
+    chain = SimulatedChain(n_accounts=1, seed="test")
+    leased = chain.oracle.lease()
+
+    assert chain.oracle.lease() is None
+    chain.oracle.release(leased["address"])
+    with pytest.raises(Exception):
+        chain.oracle.release(leased["address"])
+
+
+def recreate_oracle(chain, tmp_path, lease_ttl=3600):
+    # same key material and files as a recreated Oracle container reading the volume
+    oracle_acc, *accounts = generate_identities(3, seed="test")
+    return Oracle(
+        provider=chain.provider,
+        private_key=oracle_acc.private_key,
+        contract_file=str(tmp_path / "contract.json"),
+        lease_file=str(tmp_path / "leases.json"),
+        account_pool=[acc.private_key for acc in accounts],
+        lease_ttl=lease_ttl
+    )
+
+
+def test_leases_survive_recreated_oracle(stub_compiler, tmp_path):
+    chain = SimulatedChain(n_accounts=2, seed="test")
+    leased = recreate_oracle(chain, tmp_path).lease_account()
+
+    oracle = recreate_oracle(chain, tmp_path)
+    other = oracle.lease_account()
+    assert other["address"] != leased["address"]
+    assert oracle.lease_account() is None
+    assert oracle.release_account(leased["address"])
+
+
+def test_expired_lease_returns_to_pool(stub_compiler, tmp_path):
+    chain = SimulatedChain(n_accounts=2, seed="test")
+    oracle = recreate_oracle(chain, tmp_path, lease_ttl=0)
+    leased = oracle.lease_account()
+
+    # the client never renewed, its account is leased again instead of leaking
+    assert not oracle.renew_account(leased["address"])
+    addresses = {oracle.lease_account()["address"], oracle.lease_account()["address"]}
+    assert leased["address"] in addresses
+
+
+def test_renew_keeps_lease(stub_compiler, tmp_path):
+    chain = SimulatedChain(n_accounts=2, seed="test")
+    oracle = recreate_oracle(chain, tmp_path)
+    leased = oracle.lease_account()
+
+    assert leased["ttl"] == 3600
+    assert oracle.renew_account(leased["address"])
+    assert oracle.release_account(leased["address"])
+    assert not oracle.renew_account(leased["address"])
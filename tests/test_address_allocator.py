@@ -0,0 +1,112 @@
+import ipaddress
+import json
+import os
+
+import pytest
+
+from address_allocator import AddressAllocator
+from blockchain_deployer import BlockchainDeployer
+
+# static addresses of boot node, first non-validator node, Oracle and caching proxy
+STATIC_IPS = ("172.25.0.101", "172.25.0.104", "172.25.0.105", "172.25.0.106")
+
+
+def test_unique_addresses_for_many_nodes():
+    allocator = AddressAllocator()
+    addresses = [allocator.allocate() for _ in range(600)]
+
+    assert len({ip for ip, _ in addresses}) == 600
+    assert len({port for _, port in addresses}) == 600
+    assert all(ipaddress.ip_address(ip) in ipaddress.ip_network(allocator.subnet) for ip, _ in addresses)
+
+
+def test_reserved_addresses_are_skipped():
+    allocator = AddressAllocator()
+    for ip in STATIC_IPS:
+        allocator.reserve(ip=ip)
+    allocator.reserve(port=30310)
+    # reserved after the second subnet was opened lazily
+    allocator.reserve(ip="172.25.1.10")
+
+    addresses = [allocator.allocate() for _ in range(300)]
+
+    assert not {ip for ip, _ in addresses} & {*STATIC_IPS, "172.25.1.10"}
+    assert 30310 not in {port for _, port in addresses}
+
+
+@pytest.mark.parametrize("n_nodes, subnet", [(1, "172.25.0.0/24"), (244, "172.25.0.0/24"), (245, "172.25.0.0/23"),
+                                             (2 * 244 + 1, "172.25.0.0/22")])
+def test_subnet_grows_across_boundaries(n_nodes, subnet):
+    allocator = AddressAllocator()
+    for _ in range(n_nodes):
+        allocator.allocate()
+
+    assert allocator.subnet == subnet
+
+
+def test_exhausted_pool_raises():
+    allocator = AddressAllocator(network="172.25.0.0/23")
+    for _ in range(2 * 244):
+        allocator.allocate()
+
+    with pytest.raises(RuntimeError):
+        allocator.allocate()
+
+    allocator = AddressAllocator(port_range=(30310, 30312))
+    allocator.allocate(), allocator.allocate()
+    with pytest.raises(RuntimeError):
+        allocator.allocate()
+
+
+def test_allocation_is_deterministic():
+    first, second = AddressAllocator(), AddressAllocator()
+
+    assert [first.allocate() for _ in range(300)] == [second.allocate() for _ in range(300)]
+
+
+def deploy(config_dir, **kwargs) -> dict:
+    BlockchainDeployer(config_dir=str(config_dir), boot=False, seed="test", n_accounts=2, **kwargs)
+    with open(os.path.join(config_dir, "deployment.json"), "r") as file:
+        return json.load(file)
+
+
+def test_deployer_addresses_many_validators(tmp_path):
+    state = deploy(tmp_path, n_validator=520, n_rpc=3)
+    nodes = state["validators"] + state["rpcs"]
+    ips = [node["ip"] for node in nodes]
+    ports = [node["port"] for node in state["validators"]]
+
+    assert len(set(ips)) == len(ips) == 523
+    assert len(set(ports)) == len(ports)
+    assert not set(ips) & {"172.25.0.101", "172.25.0.105", "172.25.0.106"}
+    assert state["rpcs"][0]["ip"] == "172.25.0.104"
+    assert state["subnet"] == state["network"] == "172.25.0.0/16"
+    assert all(ipaddress.ip_address(ip) in ipaddress.ip_network(state["subnet"]) for ip in ips)
+
+
+def test_deployer_is_deterministic(tmp_path):
+    first = deploy(tmp_path / "first", n_validator=300, n_rpc=2)
+    second = deploy(tmp_path / "second", n_validator=300, n_rpc=2)
+    first.pop("volume_prefix"), second.pop("volume_prefix")
+
+    assert first == second
+    with open(tmp_path / "first" / "genesis.json") as a, open(tmp_path / "second" / "genesis.json") as b:
+        assert json.load(a) == json.load(b)
+
+
+def test_scale_out_keeps_profile_and_addresses(tmp_path):
+    deployed = deploy(tmp_path, n_validator=3, n_rpc=1, profile="latency")
+
+    # twice across the boundary of the first /24 subnet
+    deploy(tmp_path, n_validator=250, n_rpc=2, incremental=True)
+    scaled = deploy(tmp_path, n_validator=250, n_rpc=0, incremental=True)
+
+    assert scaled["profile"] == "latency"
+    assert scaled["validators"][:3] == deployed["validators"]
+    assert scaled["subnet"] == deployed["subnet"] == "172.25.0.0/16"
+    ips = [node["ip"] for node in scaled["validators"] + scaled["rpcs"]]
+    assert len(ips) == 506 and len(set(ips)) == len(ips)
+    assert {ip.rsplit(".", 2)[1] for ip in ips} == {"0", "1", "2"}
+
+    with pytest.raises(ValueError):
+        deploy(tmp_path, n_validator=1, n_rpc=0, incremental=True, profile="throughput")
@@ -0,0 +1,35 @@
+import json
+import os
+
+import pytest
+
+from oracle.app import compile_chaincode, load_compiler_cache
+from simulated_chain import CACHE_PATH, SOURCE_PATH
+
+# methods of ChainCode called by client, Oracle and benchmarks
+METHODS = {"addStr", "getStrList", "strCount", "getStrRange", "strList", "addStrRef", "hasStr", "getStr", "refCount",
+           "getRefRange", "getStrByRefRange", "refList"}
+
+
+@pytest.fixture
+def source():
+    if not os.path.exists(CACHE_PATH):
+        pytest.skip(f"{CACHE_PATH} is not committed, compile the chain code with solc to create it")
+
+    with open(SOURCE_PATH, "r") as file:
+        return file.read()
+
+
+def test_committed_artifact_matches_source(source):
+    assert load_compiler_cache(source, CACHE_PATH) is not None, \
+        f"{SOURCE_PATH} changed since {CACHE_PATH} was compiled, recompile and commit it"
+
+
+def test_committed_artifact_holds_chaincode(source):
+    abi, bytecode = compile_chaincode(SOURCE_PATH, CACHE_PATH)
+
+    assert METHODS <= {entry["name"] for entry in abi if entry["type"] == "function"}
+    assert bytes.fromhex(bytecode)
+
+    with open(CACHE_PATH, "r") as file:
+        assert set(json.load(file)) == {"source_hash", "output"}
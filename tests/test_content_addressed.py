@@ -0,0 +1,39 @@
+from client import Blockchain
+from simulated_chain import SimulatedChain
+
+
+def test_client_stores_each_string_once(chaincode, monkeypatch):
+    chain = SimulatedChain(n_accounts=2, seed="test")
+
+    # the client's own testing run stores six distinct strings
+    Blockchain(provider=chain.provider, oracle=chain.oracle, content_addressed=True).release_account()
+
+    # count the calls of chain code sent by the second client
+    calls = []
+    make_request = chain.provider.make_request
+    monkeypatch.setattr(chain.provider, "make_request",
+                        lambda method, params: calls.append(method) or make_request(method, params))
+
+    blockchain = Blockchain(provider=chain.provider, oracle=chain.oracle, content_addressed=True)
+    try:
+        # strings written by the first client are confirmed by the chain code once, then known locally
+        skipped = blockchain.skipped_writes
+        n_calls = calls.count("eth_call")
+        for _ in range(3):
+            assert blockchain.post_string_to_ledger("uff") is None
+        assert blockchain.skipped_writes == skipped + 3
+        assert calls.count("eth_call") == n_calls
+
+        # own writes are never confirmed by a call
+        assert blockchain.post_string_to_ledger("new") is not None
+        n_calls = calls.count("eth_call")
+        assert blockchain.post_string_to_ledger("new") is None
+        assert calls.count("eth_call") == n_calls
+
+        stored = blockchain.get_stored_strings_from_ledger()
+        assert stored == ["uff", "here", "are", "a", "few", "words", "new"]
+        assert blockchain.get_stored_strings_from_ledger(lazy=True) == stored
+        assert list(blockchain.iter_stored_strings(page_size=2, prefetch=2)) == stored
+        assert list(blockchain.iter_stored_strings(page_size=100)) == stored
+    finally:
+        blockchain.release_account()
@@ -0,0 +1,24 @@
+import pytest
+
+import gethwizard
+
+
+@pytest.mark.parametrize("action", ["--incremental", "--stop", "--restart"])
+def test_actions_on_running_deployment_require_config_dir(action, capsys):
+    with pytest.raises(SystemExit) as exit_info:
+        gethwizard.main(["deploy", action])
+
+    assert exit_info.value.code == 2
+    assert "require --config-dir" in capsys.readouterr().err
+
+
+def test_deploy_writes_configuration(tmp_path, capsys):
+    assert gethwizard.main(["deploy", "--no-boot", "--seed", "test", "--config-dir", str(tmp_path)]) == 0
+
+    assert (tmp_path / "deployment.json").exists()
+    assert str(tmp_path) in capsys.readouterr().out
+
+
+def test_unknown_arguments_are_only_passed_to_bench():
+    with pytest.raises(SystemExit):
+        gethwizard.main(["status", "--compare", "results.json"])
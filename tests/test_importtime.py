@@ -0,0 +1,11 @@
+import pytest
+
+from benchmarks.importtime_check import CLI_PATH, HEAVY_PACKAGES, SCENARIOS, profile_imports
+
+
+@pytest.mark.parametrize("scenario", sorted(SCENARIOS))
+def test_command_line_starts_without_heavy_packages(scenario):
+    modules = profile_imports([CLI_PATH, *SCENARIOS[scenario]])
+
+    assert "argparse" in modules
+    assert sorted({name.split(".")[0] for name in modules} & set(HEAVY_PACKAGES)) == []
@@ -0,0 +1,119 @@
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from metrics_collector import MetricsCollector, summarize
+
+
+class StubNode:
+    """
+        JSON-RPC and metrics endpoint of a geth node, serving blocks sealed every two seconds
+    """
+
+    def __init__(self):
+        self.head = 5
+        self.transactions = {6: ["0xaa", "0xbb"]}
+        self.pending = ["0xaa", "0xbb"]
+        self.filter_expired = False
+        self.metrics = {"p2p/peers": 2, "txpool/pending": 1, "chain/head/block": 5, "unselected": 0}
+
+    def rpc(self, method, params):
+        if method == "eth_newPendingTransactionFilter":
+            self.filter_expired = False
+            return {"result": "0x1"}
+        if method == "eth_getFilterChanges":
+            if self.filter_expired:
+                return {"error": {"code": -32000, "message": "filter not found"}}
+            changes, self.pending = self.pending, []
+            return {"result": changes}
+        if method == "eth_blockNumber":
+            return {"result": hex(self.head)}
+        if method == "txpool_status":
+            return {"result": {"pending": hex(len(self.pending)), "queued": "0x0"}}
+        if method == "net_peerCount":
+            return {"result": "0x2"}
+        if method == "eth_getBlockByNumber":
+            number = int(params[0], 16)
+            transactions = self.transactions.get(number, [])
+            return {"result": {"timestamp": hex(100 + 2 * number), "gasUsed": hex(21000 * len(transactions)),
+                               "gasLimit": hex(84000), "transactions": transactions}}
+        return {"error": {"code": -32601, "message": f"{method} not supported"}}
+
+
+@pytest.fixture
+def node():
+    stub = StubNode()
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_POST(self):
+            request = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+            self.respond({"jsonrpc": "2.0", "id": request["id"], **stub.rpc(request["method"], request["params"])})
+
+        def do_GET(self):
+            self.respond(stub.metrics)
+
+        def respond(self, body):
+            payload = json.dumps(body).encode()
+            self.send_response(200)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(payload)))
+            self.end_headers()
+            self.wfile.write(payload)
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    stub.url = f"http://127.0.0.1:{server.server_port}"
+
+    yield stub
+
+    server.shutdown()
+    server.server_close()
+
+
+def test_sample_records_new_blocks_and_inclusion_delays(node, tmp_path):
+    output_path = tmp_path / "metrics.jsonl"
+    collector = MetricsCollector(node.url, output_path, metrics_url=node.url,
+                                 metric_keys=("p2p/peers", "txpool/pending", "chain/head/block"))
+
+    # blocks before the first sample are not recorded
+    first = collector.sample()
+    assert [r["type"] for r in first] == ["sample", "block"]
+    assert first[0]["block"] == 5 and first[0]["peers"] == 2
+    assert first[0]["metrics"] == {"p2p/peers": 2, "txpool/pending": 1, "chain/head/block": 5}
+    assert first[1]["number"] == 5
+
+    # an expired filter is recreated with the next sample, both pending transactions were seen before
+    node.head, node.filter_expired = 7, True
+    second = collector.sample()
+    assert [(r["type"], r.get("number")) for r in second] == [("sample", None), ("block", 6), ("block", 7)]
+    assert len(second[1]["delays"]) == 2 and all(delay >= 0 for delay in second[1]["delays"])
+    assert second[2]["delays"] == []
+
+    # nothing sealed in between
+    assert [r["type"] for r in collector.sample()] == ["sample"]
+
+    with open(output_path) as file:
+        assert len(file.readlines()) == len(first) + len(second) + 1
+
+
+def test_summarize_aggregates_blocks_and_samples(node, tmp_path):
+    output_path = tmp_path / "metrics.jsonl"
+    collector = MetricsCollector(node.url, output_path)
+    collector.sample()
+    node.head = 7
+    collector.sample()
+
+    summary = summarize(output_path)
+
+    assert [block["number"] for block in summary["blocks"]] == [5, 6, 7]
+    assert summary["n_blocks"] == 3 and summary["n_txs"] == 2
+    assert summary["mean_block_time"] == 2
+    assert summary["blocks"][1]["gas_fill"] == 0.5
+    assert summary["mean_gas_fill"] == pytest.approx(0.5 / 3)
+    assert summary["p50_delay"] is not None and summary["p99_delay"] >= summary["p50_delay"]
+    assert summary["max_pending"] == 0 and summary["min_peers"] == 2
@@ -0,0 +1,69 @@
+import time
+
+import pytest
+import requests
+
+from rpc_balancer import BalancedHTTPProvider
+
+
+class StubProvider:
+    """
+        Stands in for the HTTP provider of a single node, answering with a fixed result or raising
+    """
+
+    def __init__(self, result=None, error=None):
+        self.result = result
+        self.error = error
+        self.calls = 0
+
+    def make_request(self, method, params):
+        self.calls += 1
+        if self.error is not None:
+            raise self.error
+        return {"jsonrpc": "2.0", "id": 1, "result": self.result}
+
+
+def http_error(status_code) -> requests.exceptions.HTTPError:
+    response = requests.Response()
+    response.status_code = status_code
+    return requests.exceptions.HTTPError(f"{status_code} Error", response=response)
+
+
+def balanced(*providers, **kwargs) -> BalancedHTTPProvider:
+    provider = BalancedHTTPProvider([f"http://node-{i}:8545" for i in range(len(providers))], **kwargs)
+    for endpoint, stub in zip(provider.endpoints, providers):
+        endpoint.provider = stub
+    return provider
+
+
+def test_server_error_fails_over_and_ejects_node():
+    broken, healthy = StubProvider(error=http_error(503)), StubProvider(result="0x1")
+    provider = balanced(broken, healthy, max_failures=2)
+
+    for _ in range(5):
+        assert provider.make_request("eth_blockNumber", [])["result"] == "0x1"
+
+    assert [e.outstanding for e in provider.endpoints] == [0, 0]
+    assert broken.calls == 2
+    assert provider.endpoints[0].ejected_until > time.monotonic()
+
+
+def test_client_error_is_raised_without_leaking_outstanding():
+    provider = balanced(StubProvider(error=http_error(400)), StubProvider(error=ValueError("invalid JSON")))
+
+    for _ in range(4):
+        with pytest.raises((requests.exceptions.HTTPError, ValueError)):
+            provider.make_request("eth_call", [])
+
+    assert [e.outstanding for e in provider.endpoints] == [0, 0]
+    assert [e.failures for e in provider.endpoints] == [0, 0]
+
+
+def test_all_nodes_failing_raises_last_error():
+    provider = balanced(StubProvider(error=http_error(502)), StubProvider(error=requests.exceptions.ConnectionError()))
+
+    with pytest.raises((requests.exceptions.HTTPError, requests.exceptions.ConnectionError)):
+        provider.make_request("eth_blockNumber", [])
+
+    assert [e.outstanding for e in provider.endpoints] == [0, 0]
+    assert [e.failures for e in provider.endpoints] == [1, 1]
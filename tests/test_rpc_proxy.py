@@ -0,0 +1,155 @@
+import threading
+import time
+from collections import Counter
+
+import pytest
+
+import rpc_proxy
+from rpc_proxy import RpcProxy, classify
+
+CALL = ("eth_call", [{"to": "0x0Ff11c707cF01A7cdd5A894cf39C1231E6723E9E", "data": "0x"}, "latest"])
+
+
+class StubProvider:
+    """
+        Upstream node counting the requests it answers, eth_call results depend on the head
+    """
+
+    def __init__(self):
+        self.head = 5
+        self.calls = Counter()
+        self.gate = threading.Event()
+        self.gate.set()
+
+    def make_request(self, method, params):
+        self.calls[method] += 1
+        self.gate.wait(timeout=5)
+
+        if method == "eth_blockNumber":
+            return {"jsonrpc": "2.0", "id": 9, "result": hex(self.head)}
+        if method == "eth_call":
+            return {"jsonrpc": "2.0", "id": 9, "result": hex(self.head)}
+        if method == "eth_getTransactionReceipt":
+            return {"jsonrpc": "2.0", "id": 9, "result": None if self.head < 6 else {"blockNumber": hex(self.head)}}
+        if method == "eth_getBalance":
+            raise ConnectionError("upstream down")
+        return {"jsonrpc": "2.0", "id": 9, "result": f"{method} {self.calls[method]}"}
+
+
+@pytest.fixture
+def upstream():
+    return StubProvider()
+
+
+def test_classify():
+    assert classify("eth_chainId", []) == "immutable"
+    assert classify("eth_getBalance", ["0x1", "earliest"]) == "immutable"
+    assert classify("eth_call", [{}, {"blockHash": "0x1"}]) == "immutable"
+    assert classify(*CALL) == "block"
+    assert classify("eth_getTransactionCount", ["0x1", "pending"]) is None
+    assert classify("eth_sendRawTransaction", ["0xdead"]) is None
+
+
+def test_identical_requests_are_coalesced(upstream):
+    proxy = RpcProxy(provider=upstream, head_ttl=10)
+    responses = list()
+
+    # the first request is held upstream until all others wait for it
+    upstream.gate.clear()
+    threads = [threading.Thread(target=lambda: responses.append(proxy.call("eth_chainId", []))) for _ in range(20)]
+    for thread in threads:
+        thread.start()
+
+    deadline = time.monotonic() + 5
+    while proxy.metrics["coalesced"] < 19 and time.monotonic() < deadline:
+        time.sleep(0.01)
+    upstream.gate.set()
+    for thread in threads:
+        thread.join()
+
+    assert upstream.calls["eth_chainId"] == 1
+    assert len(responses) == 20 and all(response["result"] == "eth_chainId 1" for response in responses)
+    assert proxy.metrics["coalesced"] == 19 and proxy.metrics["misses"] == 1
+
+    # served from the cache afterwards
+    proxy.call("eth_chainId", [])
+    assert upstream.calls["eth_chainId"] == 1 and proxy.metrics["hits"] == 1
+
+
+def test_results_of_previous_head_are_invalidated(upstream):
+    proxy = RpcProxy(provider=upstream, head_ttl=0)
+
+    assert proxy.call(*CALL)["result"] == "0x5"
+    assert proxy.call(*CALL)["result"] == "0x5"
+    assert upstream.calls["eth_call"] == 1
+
+    upstream.head = 6
+    assert proxy.call(*CALL)["result"] == "0x6"
+    assert upstream.calls["eth_call"] == 2
+    assert proxy.call("eth_blockNumber", [])["result"] == "0x6"
+
+
+def test_mined_receipt_advances_head(upstream):
+    proxy = RpcProxy(provider=upstream, head_ttl=10)
+
+    assert proxy.call(*CALL)["result"] == "0x5"
+
+    # a missing receipt is not cached, the mined one reveals the new head before the cached head expired
+    assert proxy.call("eth_getTransactionReceipt", ["0xa"])["result"] is None
+    upstream.head = 6
+    assert proxy.call("eth_getTransactionReceipt", ["0xa"])["result"] == {"blockNumber": "0x6"}
+    assert upstream.calls["eth_getTransactionReceipt"] == 2
+
+    assert proxy.call(*CALL)["result"] == "0x6"
+
+
+def test_writes_and_pending_state_are_passed_through(upstream):
+    proxy = RpcProxy(provider=upstream, head_ttl=10)
+
+    for method, params in (("eth_sendRawTransaction", ["0xdead"]), ("eth_getTransactionCount", ["0x1", "pending"])):
+        assert proxy.call(method, params)["result"] == f"{method} 1"
+        assert proxy.call(method, params)["result"] == f"{method} 2"
+
+    assert proxy.metrics["passthrough"] == 4 and proxy.metrics["hits"] == 0
+
+
+def test_upstream_failure_is_reported_and_not_cached(upstream):
+    proxy = RpcProxy(provider=upstream, head_ttl=10)
+
+    for _ in range(2):
+        response = proxy.call("eth_getBalance", ["0x1", "earliest"])
+        assert response["error"]["code"] == rpc_proxy.UPSTREAM_ERROR
+
+    assert upstream.calls["eth_getBalance"] == 2 and proxy.metrics["errors"] == 2
+
+
+def test_http_endpoint_keeps_ids_of_batch(upstream, monkeypatch):
+    monkeypatch.setattr(rpc_proxy, "proxy", RpcProxy(provider=upstream, head_ttl=10), raising=False)
+    client = rpc_proxy.app.test_client()
+
+    response = client.post("/", json=[{"jsonrpc": "2.0", "id": 1, "method": "eth_chainId", "params": []},
+                                      {"jsonrpc": "2.0", "id": 2, "method": "eth_blockNumber"}])
+
+    assert response.json == [{"jsonrpc": "2.0", "id": 1, "result": "eth_chainId 1"},
+                             {"jsonrpc": "2.0", "id": 2, "result": "0x5"}]
+    assert client.get("/metrics").json["head"] == 5
+
+
+def test_pending_transaction_is_not_cached(upstream, monkeypatch):
+    proxy = RpcProxy(provider=upstream, head_ttl=10)
+    transaction = {"hash": "0xa", "blockNumber": None}
+
+    def make_request(method, params):
+        upstream.calls[method] += 1
+        return {"jsonrpc": "2.0", "id": 9, "result": dict(transaction)}
+
+    monkeypatch.setattr(upstream, "make_request", make_request)
+
+    assert proxy.call("eth_getTransactionByHash", ["0xa"])["result"]["blockNumber"] is None
+
+    # mined meanwhile, the new result is cached forever
+    transaction["blockNumber"] = "0x6"
+    for _ in range(2):
+        assert proxy.call("eth_getTransactionByHash", ["0xa"])["result"]["blockNumber"] == "0x6"
+
+    assert upstream.calls["eth_getTransactionByHash"] == 2
@@ -0,0 +1,40 @@
+import hashlib
+import json
+
+import pytest
+from solcx import get_installed_solc_versions
+from web3 import Web3
+
+from conftest import STUB_ABI, STUB_BYTECODE
+from oracle.app import SOLC_VERSION, can_compile_offline, compile_chaincode
+from profiles import PROFILES
+from simulated_chain import SimulatedChain
+
+@pytest.mark.parametrize("profile", sorted(PROFILES))
+def test_oracle_deploys_within_block_gas_limit(stub_compiler, profile):
+    chain = SimulatedChain(profile=profile, n_accounts=2, seed="test")
+    web3 = Web3(chain.provider)
+
+    address = chain.oracle.contract()["address"]
+    assert web3.eth.get_code(address) == b"\x00"
+
+    block = web3.eth.get_block("latest")
+    assert block["gasUsed"] <= block["gasLimit"] == PROFILES[profile].gas_limit
+
+
+def test_cached_compiler_output_is_used_offline(tmp_path):
+    source_path, cache_path = tmp_path / "chaincode.sol", tmp_path / "compiled_code.json"
+    source_path.write_text("contract ChainCode {}")
+    assert not can_compile_offline(source_path, cache_path) or SOLC_VERSION in map(str, get_installed_solc_versions())
+
+    contract = {
+        "evm": {"bytecode": {"object": STUB_BYTECODE[2:]}},
+        "metadata": json.dumps({"output": {"abi": STUB_ABI}})
+    }
+    cache_path.write_text(json.dumps({
+        "source_hash": hashlib.sha256(source_path.read_text().encode()).hexdigest(),
+        "output": {"contracts": {"chaincode.sol": {"ChainCode": contract}}}
+    }))
+
+    assert can_compile_offline(source_path, cache_path)
+    assert compile_chaincode(source_path, cache_path) == (STUB_ABI, STUB_BYTECODE[2:])
@@ -0,0 +1,119 @@
+from types import SimpleNamespace
+
+import pytest
+from web3 import Web3
+from web3.exceptions import TransactionNotFound
+
+from tx_tracker import TransactionTracker
+
+SENDER = "0x0Ff11c707cF01A7cdd5A894cf39C1231E6723E9E"
+GWEI = 10 ** 9
+
+
+class StubEth:
+    """
+        Node sealing one block per poll of the tracker, mining the pending submission accepted by its policy
+    """
+
+    def __init__(self, accepts=lambda transaction: True, foreign_nonce=False):
+        self.accepts = accepts
+        self.foreign_nonce = foreign_nonce
+        self.head = 10
+        self.nonce = 0
+        self.submitted = list()
+        self.receipts = dict()
+        self.account = SimpleNamespace(
+            from_key=lambda private_key: SimpleNamespace(address=SENDER),
+            sign_transaction=lambda transaction, private_key: SimpleNamespace(
+                rawTransaction=transaction, hash=Web3.keccak(text=repr(sorted(transaction.items())))
+            )
+        )
+
+    @property
+    def block_number(self) -> int:
+        return self.head
+
+    def send_raw_transaction(self, transaction):
+        self.submitted.append(transaction)
+
+    def get_transaction_count(self, address, block_identifier):
+        # every poll seals a block, mining the newest accepted submission or a transaction of another sender
+        self.head += 1
+        if self.nonce == 0:
+            if self.foreign_nonce:
+                self.nonce = 1
+            for transaction in reversed(self.submitted):
+                if self.accepts(transaction):
+                    self.nonce = 1
+                    self.receipts[self.hash_of(transaction)] = {"status": 1, "blockNumber": self.head}
+                    break
+        return self.nonce
+
+    def get_transaction_receipt(self, tx_hash):
+        if tx_hash not in self.receipts:
+            raise TransactionNotFound(tx_hash)
+        return self.receipts[tx_hash]
+
+    def hash_of(self, transaction) -> str:
+        return Web3.to_hex(self.account.sign_transaction(transaction, None).hash)
+
+
+def tracker(eth, **kwargs) -> TransactionTracker:
+    web3 = SimpleNamespace(eth=eth, to_hex=Web3.to_hex, from_wei=Web3.from_wei)
+    return TransactionTracker(web3, "0x" + "11" * 32, poll_interval=0, **kwargs)
+
+
+def transaction(**fees) -> dict:
+    return {"nonce": 0, "to": SENDER, "value": 0, "gas": 21000, **(fees or {"gasPrice": GWEI})}
+
+
+def test_first_submission_is_included():
+    eth = StubEth()
+    outcome = tracker(eth).send(transaction())
+
+    assert outcome.status == "included" and len(outcome.tx_hashes) == 1
+    assert outcome.receipt == {"status": 1, "blockNumber": 11}
+
+
+def test_stuck_transaction_is_replaced_with_bumped_fees():
+    eth = StubEth(accepts=lambda tx: tx["gasPrice"] >= 2 * GWEI)
+    outcome = tracker(eth, stuck_blocks=3, bump=1.125).send(transaction())
+
+    prices = [tx["gasPrice"] for tx in eth.submitted]
+    assert outcome.status == "replaced" and outcome.gas_price == prices[-1] >= 2 * GWEI
+    assert len(outcome.tx_hashes) == len(prices) == 7
+    assert all(new >= old * 1.1 for old, new in zip(prices, prices[1:]))
+    assert {tx["nonce"] for tx in eth.submitted} == {0}
+
+
+def test_bump_raises_all_dynamic_fees_by_at_least_the_minimum():
+    eth = StubEth(accepts=lambda tx: len(eth.submitted) > 1)
+    tracker(eth, stuck_blocks=1, bump=1.01).send(transaction(maxFeePerGas=100, maxPriorityFeePerGas=10))
+
+    first, second = eth.submitted[:2]
+    assert second["maxFeePerGas"] == 111 and second["maxPriorityFeePerGas"] == 12
+
+
+def test_nonce_used_by_another_transaction_is_dropped():
+    eth = StubEth(accepts=lambda tx: False, foreign_nonce=True)
+    outcome = tracker(eth).send(transaction())
+
+    assert outcome.status == "dropped" and outcome.receipt is None
+    assert outcome.gas_price == GWEI
+
+
+def test_resubmissions_stop_at_max_gas_price():
+    eth = StubEth(accepts=lambda tx: False)
+
+    with pytest.raises(TimeoutError):
+        tracker(eth, stuck_blocks=1, bump=2, max_gas_price=5 * GWEI, timeout=0.05).send(transaction())
+
+    prices = [tx["gasPrice"] for tx in eth.submitted]
+    assert prices == [GWEI, 2 * GWEI, 4 * GWEI]
+
+
+def test_timeout_names_last_submission():
+    eth = StubEth(accepts=lambda tx: False)
+
+    with pytest.raises(TimeoutError, match=eth.hash_of(transaction())):
+        tracker(eth, stuck_blocks=10 ** 9, timeout=0.01).send(transaction())
@@ -0,0 +1,187 @@
+import time
+from typing import List, NamedTuple
+
+from web3.exceptions import TransactionNotFound
+
+# minimum increase of the gas price in percent accepted by geth's txpool for a replacement (--txpool.pricebump)
+MIN_PRICE_BUMP = 10
+
+# fee fields of legacy and dynamic fee transactions, bumped together on every resubmission
+FEE_FIELDS = ("gasPrice", "maxFeePerGas", "maxPriorityFeePerGas")
+
+
+class TxOutcome(NamedTuple):
+    """
+        Final state of a tracked transaction
+    """
+
+    # 'included' if the first submission was mined, 'replaced' if a fee-bumped resubmission was mined instead,
+    # 'dropped' if the nonce was consumed by a transaction which was not submitted by the tracker
+    status: str
+
+    # receipt of the mined submission, None if dropped
+    receipt: dict | None
+
+    # hashes of all submissions in the order they were sent, all share the same nonce
+    tx_hashes: List[str]
+
+    # gas price in WEI of the mined submission, of the last submission if dropped
+    gas_price: int
+
+
+def _gas_price(transaction) -> int:
+    """
+    Reads the price paid per unit of gas at most
+    Args:
+        transaction: Legacy or dynamic fee transaction
+
+    Returns: Gas price in WEI
+
+    """
+    return int(transaction.get("gasPrice", transaction.get("maxFeePerGas", 0)))
+
+
+class TransactionTracker:
+    """
+        Sends signed transactions and resubmits them with the same nonce and a bumped gas price while they are stuck
+    """
+
+    def __init__(self, web3, private_key, stuck_blocks=3, bump=1.125, max_gas_price=None, poll_interval=0.2,
+                 timeout=120):
+        """
+        Creates instance of TransactionTracker
+        Args:
+            web3: Web3 object connected to the non-validator nodes
+            private_key: Private key signing all transactions and their resubmissions
+            stuck_blocks: Number of sealed blocks without inclusion after which a transaction counts as stuck
+            bump: Factor the gas price is multiplied with on each resubmission, at least geth's minimum price bump
+            max_gas_price: Optional gas price in WEI which is never exceeded by a resubmission
+            poll_interval: Seconds between two checks for a receipt
+            timeout: Seconds after which the tracker gives up waiting for any submission to be mined
+        """
+        self.__web3 = web3
+        self.__private_key = private_key
+        self.__stuck_blocks = stuck_blocks
+        self.__bump = bump
+        self.__max_gas_price = max_gas_price
+        self.__poll_interval = poll_interval
+        self.__timeout = timeout
+
+    def __submit(self, transaction) -> str:
+        """
+        Signs and sends a single submission, a submission already known by the node is not an error
+        Args:
+            transaction: Transaction with nonce and fee fields set
+
+        Returns: Hash of the submission
+
+        """
+        signed_transaction = self.__web3.eth.account.sign_transaction(transaction, private_key=self.__private_key)
+
+        try:
+            self.__web3.eth.send_raw_transaction(signed_transaction.rawTransaction)
+        except ValueError as e:
+            # a submission mined or replaced meanwhile is detected by the next receipt and nonce check
+            if not any(reason in str(e) for reason in ("already known", "nonce too low", "underpriced")):
+                raise
+
+        return self.__web3.to_hex(signed_transaction.hash)
+
+    def __bumped(self, transaction) -> dict | None:
+        """
+        Raises all fee fields of a transaction by the bump factor, at least by geth's minimum price bump
+        Args:
+            transaction: Previous submission
+
+        Returns: Transaction with bumped fees, None if it would exceed the maximum gas price
+
+        """
+        bumped = dict(transaction)
+
+        for field in FEE_FIELDS:
+            if field in transaction:
+                price = int(transaction[field])
+                bumped[field] = max(int(price * self.__bump), price * (100 + MIN_PRICE_BUMP) // 100 + 1)
+
+        if self.__max_gas_price is not None and _gas_price(bumped) > self.__max_gas_price:
+            return None
+
+        return bumped
+
+    def __find_receipt(self, tx_hashes):
+        """
+        Looks up the receipt of any submission, newest first
+        Args:
+            tx_hashes: Hashes of all submissions
+
+        Returns: Index of the mined submission and its receipt, (None, None) if none was mined yet
+
+        """
+        for index in reversed(range(len(tx_hashes))):
+            try:
+                return index, self.__web3.eth.get_transaction_receipt(tx_hashes[index])
+            except TransactionNotFound:
+                continue
+
+        return None, None
+
+    def send(self, transaction) -> TxOutcome:
+        """
+        Sends a transaction and awaits its inclusion, resubmitting it with a bumped gas price every stuck_blocks
+        blocks. Raises TimeoutError if no submission was mined within the timeout, the last submission may still
+        be mined afterwards.
+        Args:
+            transaction: Transaction with nonce and gas price set
+
+        Returns: Outcome with the receipt of the mined submission
+
+        """
+        sender = self.__web3.eth.account.from_key(self.__private_key).address
+        nonce = transaction["nonce"]
+
+        # all submissions and their hashes, sharing the nonce
+        transactions = [transaction]
+        tx_hashes = [self.__submit(transaction)]
+        submitted_at = self.__web3.eth.block_number
+        deadline = time.monotonic() + self.__timeout
+
+        # block at which the nonce was seen consumed without a receipt of any submission
+        consumed_at = None
+
+        while True:
+            # nonce is read before the receipts, a submission mined in between is still found
+            mined_nonce = self.__web3.eth.get_transaction_count(sender, "latest")
+            index, receipt = self.__find_receipt(tx_hashes)
+            head = self.__web3.eth.block_number
+
+            if receipt is not None:
+                return TxOutcome(
+                    status="included" if index == 0 else "replaced",
+                    receipt=receipt,
+                    tx_hashes=tx_hashes,
+                    gas_price=_gas_price(transactions[index])
+                )
+
+            if mined_nonce > nonce:
+                # the node answering the nonce may be a block ahead of the node answering the receipts
+                consumed_at = head if consumed_at is None else consumed_at
+                if head > consumed_at + 1:
+                    return TxOutcome(status="dropped", receipt=None, tx_hashes=tx_hashes,
+                                     gas_price=_gas_price(transactions[-1]))
+
+            elif head - submitted_at >= self.__stuck_blocks:
+                bumped = self.__bumped(transactions[-1])
+
+                # keep waiting for the last submission once the maximum gas price is reached
+                if bumped is not None:
+                    transactions.append(bumped)
+                    tx_hashes.append(self.__submit(bumped))
+                    print(f"TRACKER: Nonce {nonce} stuck for {head - submitted_at} blocks, resubmitted with "
+                          f"{self.__web3.from_wei(_gas_price(bumped), 'gwei')} gwei")
+                submitted_at = head
+
+            if time.monotonic() > deadline:
+                raise TimeoutError(f"Transaction with nonce {nonce} not mined after {self.__timeout}s, "
+                                   f"last submission {tx_hashes[-1]}")
+
+            time.sleep(self.__poll_interval)